@@ -0,0 +1,72 @@
+"""STARBUCKS-=-PLATFORMER, a platformer in the terminal. Play it with
+python3 -m consolegame.
+
+Importing the package does nothing by itself: each part is imported the
+first time something in it is used, so a worker that only needs
+consolegame.generate_level loads the level code and never curses or the
+terminal."""
+
+# The public names of each part, in the order the parts import each other.
+# Add a name here when it's added to its part.
+EXPORTS = {
+    "levels": (
+        "load_handcrafted_level", "generate_level", "CHUNK_WIDTH", "CHUNKS_AHEAD", "CHUNKS_BEHIND",
+        "CHUNK_CACHE_SIZE", "STREAM_MIN_SCREENS", "generate_chunk", "ChunkCache", "CHUNK_CACHE",
+        "stream_level", "GENERATOR_VERSION", "LEVEL_MAGIC", "PACK_MAGIC", "LEVEL_HEADER",
+        "LEVEL_COUNTS", "RECT_RECORD", "PLAYER_RECORD", "ENEMY_RECORD", "HEART_RECORD",
+        "PACK_HEADER", "PACK_ENTRY", "ENEMY_TYPES", "LEVEL_CACHE_SIZE", "pack_level",
+        "unpack_level", "write_level_pack", "LevelPack", "build_level", "LevelCache", "LEVEL_CACHE",
+        "load_level", "from_pack"),
+    "engine": (
+        "collides", "lerp", "TICK_RATE", "FRAME_RATE", "MAX_CATCHUP_TICKS", "GameClock",
+        "PROFILE_PHASES", "PROFILE_WINDOW", "FrameProfiler", "Rect", "Player", "load_numpy",
+        "float_array", "append_to", "delete_at", "drop_last", "FLY_PERIOD", "FLY_HEIGHT",
+        "FLY_PATH", "FLY_TABLE", "SLIME_REST", "SLIME_HOP", "SLIME_GRAVITY", "ENEMY_RISE",
+        "EnemyStore", "ENEMY_MOVES", "HeartStore", "GRID_CELL", "BROAD_PHASE_MIN", "extent",
+        "patrol_box", "BroadPhase", "build_broad_phase", "PLAYER_SPAWN_X", "JUMP_VELOCITY",
+        "GRAVITY", "BASE_SPEED", "STOMP_BOUNCE", "HEART_DROP_CHANCE", "WAKE_MARGIN", "camera_x",
+        "new_world", "sync_level", "load_chunk", "unload_chunk", "stream_chunks", "effective_speed",
+        "respawn_player", "view_x", "step", "ends_level", "SCRIPT_ACTIONS", "KEY_ACTIONS",
+        "parse_input_script", "simulate", "SOLVER_MOVES", "SOLVER_MAX_STATES", "SOLVER_GAVE_UP",
+        "solve_level", "compress_script", "ARC_TICKS", "jump_arc", "JUMP_ARC", "landing_ticks", "LANDING_TICK",
+        "LevelGraph", "Bot", "run_bot", "RECORDING_VERSION", "Recorder", "Replay"),
+    "save": (
+        "SAVE_VERSION", "SAVE_MAGIC", "SAVE_HEADER", "SAVE_RECORD", "SAVE_ENDLESS",
+        "CHECKPOINT_HEAD", "SAVE_COUNTS", "RNG_STATE", "PLAYER_STATE", "ENEMY_MOVE", "SAVE_ENEMY",
+        "HEART_MOVE", "SAVE_ID", "SAVE_CHUNK", "BROAD_KINDS", "SAVE_EVERY_TICKS",
+        "SAVE_COMPACT_EVERY", "copy_column", "capture_world", "diff_rows", "pack_checkpoint",
+        "apply_checkpoint", "load_save", "restore_ids", "restore_world", "SaveGame"),
+    "boss": (
+        "BOSS_DURATION", "BOSS_BOARD_PERIOD", "BOSS_GRAB_DELAY", "BOSS_RESULT_SECONDS",
+        "generate_boss_board", "screen_event_loop", "boss_fight"),
+    "render": (
+        "rename_tab", "CursesScreen", "ScriptEnded", "MemoryScreen", "ANSI_KEYS", "AnsiScreen",
+        "run_on_screen", "KEY_REPEAT", "KEY_RELEASE", "KeyInput", "LOCAL_KEYS", "PLAYER_GLYPHS",
+        "MAX_PLAYERS", "BLANK", "Renderer", "draw_hud"),
+    "game": (
+        "enemy_rows", "draw_world", "play_level", "LevelInspector", "show_level_code", "main"),
+    "net": (
+        "NET_PORT", "NET_HEADER", "NET_TICK", "NET_RECORDS", "NET_BUTTONS", "send_msg", "recv_msg",
+        "recv_exact", "net_lives", "NetDelta", "apply_delta", "serve", "serve_main", "net_client"),
+    "cli": (
+        "headless_main", "replay_main", "parse_key_script", "run_scripted", "scripted_main",
+        "validate_job", "validate_main", "build_pack_main"),
+    "bench": (
+        "stress_level", "bench_collisions", "BENCH_VERSION", "BENCH_REPEAT", "BENCH_MIN_TIME",
+        "BENCH_TOLERANCE", "BENCH_QUICK_TOLERANCE", "best_time", "bench_generate", "bench_step",
+        "bench_render", "bench_enemies", "bench_boss", "bench_save", "run_benchmarks",
+        "compare_benchmarks", "bench_main"),
+}
+PARTS = tuple(EXPORTS)
+NAMES = {name: part for part, names in EXPORTS.items() for name in names}
+
+def __getattr__(name):
+    import importlib
+    if name in EXPORTS:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in NAMES:
+        return getattr(importlib.import_module(f"{__name__}.{NAMES[name]}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(EXPORTS) | set(NAMES))
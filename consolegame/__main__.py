@@ -0,0 +1,128 @@
+"""python3 -m consolegame plays the game; a first argument of --headless,
+--replay, --scripted, --validate, --build-pack, --bench,
+--bench-collisions, --serve or --profile-startup runs that tool instead.
+Each one imports only the parts of the package it uses."""
+import time
+STARTED = time.perf_counter()
+import sys, os, importlib
+
+if not __package__:
+    # run as a folder (python3 path/to/consolegame) instead of with -m
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# first argument -> (module, function taking the rest of the arguments)
+MODES = {"--headless": ("consolegame.cli", "headless_main"),
+         "--replay": ("consolegame.cli", "replay_main"),
+         "--scripted": ("consolegame.cli", "scripted_main"),
+         "--validate": ("consolegame.cli", "validate_main"),
+         "--build-pack": ("consolegame.cli", "build_pack_main"),
+         "--bench": ("consolegame.bench", "bench_main"),
+         "--serve": ("consolegame.net", "serve_main")}
+
+def profile_startup(argv):
+    """Time a cold start: importing each part of the package in turn, then
+    building level 1 and drawing its first frame on an in-memory screen."""
+    import argparse
+    parser = argparse.ArgumentParser(prog="python3 -m consolegame --profile-startup",
+                                     description="Show where the time to the first frame goes.")
+    parser.add_argument("--size", default="24x80", help="screen size as ROWSxCOLS (default 24x80)")
+    args = parser.parse_args(argv)
+    sh, sw = (int(n) for n in args.size.lower().split("x"))
+    steps = []
+
+    def timed(name, fn):
+        started = time.perf_counter()
+        result = fn()
+        steps.append((name, time.perf_counter() - started))
+        return result
+
+    for part in ("levels", "engine", "save", "boss", "render", "game"):
+        timed(f"import {part}", lambda: importlib.import_module(f"consolegame.{part}"))
+        if part == "engine":
+            worker = sum(seconds for _, seconds in steps)
+            worker_curses = "curses" in sys.modules
+    from consolegame.levels import load_level
+    from consolegame.engine import load_numpy, new_world
+    from consolegame.render import MemoryScreen, Renderer
+    from consolegame.game import draw_world
+    level = timed("build level 1", lambda: load_level(1, sh, sw))
+    numpy = timed("import numpy", load_numpy)
+
+    def first_frame():
+        world = new_world(level, {"lives": 3, "speed_bonus": 0}, sh, sw)
+        renderer = Renderer(MemoryScreen(sh, sw))
+        renderer.set_static(level)
+        draw_world(renderer, world)
+        renderer.present()
+    timed("first frame", first_frame)
+    for name, seconds in steps:
+        print(f"{name:<16} {seconds * 1000:>8.2f} ms")
+    print(f"{'total':<16} {(time.perf_counter() - STARTED) * 1000:>8.2f} ms  (since python reached __main__)")
+    print(f"a headless worker (levels + engine) starts in {worker * 1000:.2f} ms, "
+          f"curses {'loaded' if worker_curses else 'not loaded'}, "
+          f"numpy {'loads with the first world' if numpy is not None else 'not installed'}")
+    return 0
+
+def play(argv):
+    import argparse
+    from consolegame.levels import LEVEL_CACHE, LevelPack
+    from consolegame.engine import FrameProfiler
+    from consolegame.save import SaveGame
+    from consolegame.render import KEY_REPEAT, MAX_PLAYERS, rename_tab, run_on_screen
+    from consolegame.game import main
+    parser = argparse.ArgumentParser(prog="python3 -m consolegame", description="STARBUCKS-=-PLATFORMER")
+    parser.add_argument("--screens", type=int, default=1, help="make levels 11+ this many screens wide")
+    parser.add_argument("--endless", action="store_true", help="levels 11+ go on forever")
+    parser.add_argument("--pack", action="append", default=[], help="prebuilt level pack to play from")
+    parser.add_argument("--record", metavar="DIR", help="save a replayable recording of every level played")
+    parser.add_argument("--screen", choices=("curses", "ansi"), default="curses",
+                        help="draw through curses or with raw ANSI escapes")
+    parser.add_argument("--key-repeat", type=float, default=KEY_REPEAT, metavar="PER_SEC",
+                        help="holding a move key moves this many times a second (default: once per key repeat)")
+    parser.add_argument("--profile-trace", metavar="FILE",
+                        help="time every frame and write them to FILE on exit (.csv or .json)")
+    parser.add_argument("--players", type=int, default=1,
+                        help=f"1-{MAX_PLAYERS} players on one keyboard: Ctrl+A/D/W, a/d/w, j/l/i, arrows")
+    parser.add_argument("--connect", metavar="HOST[:PORT]", help="join a game hosted with --serve")
+    parser.add_argument("--save", metavar="FILE", help="keep the game in FILE and carry on from it next time")
+    args = parser.parse_args(argv)
+    for path in args.pack:
+        LEVEL_CACHE.packs.append(LevelPack(path))
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+    rename_tab()
+    if args.connect:
+        from consolegame.net import NET_PORT, net_client
+        host, _, port = args.connect.partition(":")
+        result = run_on_screen(args.screen, net_client, host, int(port or NET_PORT), args.key_repeat)
+        print(f"result: {result}")
+        return 0
+    profiler = FrameProfiler(trace=True) if args.profile_trace else None
+    saver = SaveGame(args.save) if args.save else None
+    try:
+        run_on_screen(args.screen, main, max(1, args.screens), args.endless, args.record, profiler,
+                      args.key_repeat, max(1, min(args.players, MAX_PLAYERS)), saver)
+    finally:
+        if profiler:
+            profiler.dump(args.profile_trace)
+        if saver:
+            saver.close()
+    if saver and saver.error:
+        print(f"could not save to {args.save}: {saver.error}", file=sys.stderr)
+        return 1
+    return 0
+
+def run(argv):
+    if argv[:1] == ["--profile-startup"]:
+        return profile_startup(argv[1:])
+    if argv[:1] == ["--bench-collisions"]:
+        from consolegame.bench import bench_collisions
+        bench_collisions()
+        return 0
+    if argv[:1] and argv[0] in MODES:
+        module, name = MODES[argv[0]]
+        return getattr(importlib.import_module(module), name)(argv[1:])
+    return play(argv)
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv[1:]))
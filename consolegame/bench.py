@@ -0,0 +1,250 @@
+"""Benchmarks (--bench) and the collision stress test (--bench-collisions)."""
+import time, random, os, sys, json
+from .levels import ENEMY_TYPES, generate_level, load_handcrafted_level
+from .engine import (BROAD_PHASE_MIN, EnemyStore, build_broad_phase, load_numpy, new_world,
+                     parse_input_script, step)
+from .save import SaveGame, capture_world, load_save, restore_world
+from .boss import generate_boss_board
+from .render import AnsiScreen, MemoryScreen, Renderer
+from .game import draw_world
+
+# ─── BENCHMARKS ─────────────────────────────────────────────
+def stress_level(count, sh=24, sw=80, seed=0):
+    """A scrolling level with roughly count platforms and count enemies (plus
+    a fifth as many planes and lava strips), for timing collision code."""
+    rng = random.Random(seed)
+    width = max(sw, count * 4)
+    level = load_handcrafted_level(1, sh, width)
+    level["width"] = width
+    for i in range(count):
+        level["platforms"].append({'x': rng.randint(0, width - 15), 'y': rng.randint(4, sh - 4),
+                                   'w': rng.randint(3, 15), 'h': 1})
+        x = rng.randint(20, width - 10)
+        level["enemies"].append({'x': float(x), 'y': float(rng.randint(4, sh - 4)),
+                                 'vx': rng.choice([0.5, -0.5]), 'width': 3, 'height': 1,
+                                 'min_x': x - 6, 'max_x': x + 6, 'type': 'basic'})
+        if i % 5 == 0:
+            level["planes"].append({'x': rng.randint(20, width - 10), 'y': rng.randint(3, sh - 10),
+                                    'w': rng.randint(3, 10), 'h': 1})
+            level["lava"].append({'x': rng.randint(20, width - 10), 'y': rng.randint(3, sh - 10),
+                                  'w': rng.randint(3, 10), 'h': 1})
+    return level, sh, sw
+
+def bench_collisions(counts=(10, 100, 1000, 5000), ticks=2000):
+    """Ticks/s of step() on ever bigger levels, with the grid and with a
+    plain loop over every object."""
+    script = parse_input_script("R*3 RJ") * (ticks // 4 + 1)
+    print(f"{'objects':>8} {'grid ticks/s':>14} {'loop ticks/s':>14}")
+    for count in counts:
+        rates = []
+        for min_objects in (BROAD_PHASE_MIN, float("inf")):
+            level, sh, sw = stress_level(count)
+            world = new_world(level, {"lives": 10 ** 9, "speed_bonus": 0}, sh, sw, random.Random(0))
+            world["broad"] = build_broad_phase(world, min_objects)
+            started = time.perf_counter()
+            for t in range(ticks):
+                step(world, script[t])
+            rates.append(ticks / (time.perf_counter() - started))
+        print(f"{count:>8} {rates[0]:>14.0f} {rates[1]:>14.0f}")
+
+# Benchmarks: every number is the best of a few runs so a busy machine
+# doesn't look like a regression. Short cases run again and again until
+# they've been timed for BENCH_MIN_TIME, or one slow run would swing them.
+# Seeds are fixed so runs compare.
+BENCH_VERSION = 1
+BENCH_REPEAT = 3
+BENCH_MIN_TIME = 0.2      # seconds each case is timed for, at least
+BENCH_TOLERANCE = 0.15    # slower than the baseline by this much is a regression
+BENCH_QUICK_TOLERANCE = 0.3
+
+def best_time(fn, repeat=BENCH_REPEAT, min_time=BENCH_MIN_TIME):
+    best = float("inf")
+    runs = total = 0
+    while runs < repeat or total < min_time:
+        started = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - started
+        best = min(best, seconds)
+        runs += 1
+        total += seconds
+    return best
+
+def bench_generate(levels=(11, 50, 200), sizes=((24, 80), (50, 200)), count=20):
+    results = {}
+    for sh, sw in sizes:
+        for level_num in levels:
+            def run():
+                for n in range(level_num, level_num + count):
+                    generate_level(n, sh, sw)
+            results[f"generate/level{level_num}/{sh}x{sw}"] = (count / best_time(run), "levels/s")
+    return results
+
+def bench_step(counts=(10, 100, 1000), ticks=1000):
+    results = {}
+    script = parse_input_script("R*3 RJ") * (ticks // 4 + 1)
+    for count in counts:
+        def run():
+            level, sh, sw = stress_level(count)
+            world = new_world(level, {"lives": 10 ** 9, "speed_bonus": 0}, sh, sw, random.Random(0))
+            for t in range(ticks):
+                step(world, script[t])
+        results[f"step/{count}objects"] = (ticks / best_time(run), "ticks/s")
+    return results
+
+def bench_render(frames=300):
+    """A Renderer drawing while the player runs right: a level that fits
+    the screen and one that scrolls every frame, into a MemoryScreen and
+    through an AnsiScreen writing to /dev/null."""
+    results = {}
+    sh, sw = 24, 80
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    fits = generate_level(15, sh, sw)
+    wide = generate_level(15, sh, sw, sw * 4)
+    cases = {"screen": (fits, lambda: MemoryScreen(sh, sw)),
+             "scrolling": (wide, lambda: MemoryScreen(sh, sw)),
+             "ansi/screen": (fits, lambda: AnsiScreen(devnull, size=(sh, sw))),
+             "ansi/scrolling": (wide, lambda: AnsiScreen(devnull, size=(sh, sw)))}
+    for name, (level, screen) in cases.items():
+        def run():
+            world = new_world(level, {"lives": 10 ** 9, "speed_bonus": 0}, sh, sw, random.Random(0))
+            renderer = Renderer(screen())
+            renderer.set_static(level)
+            for t in range(frames):
+                step(world, ("right",) if t % 4 else ("right", "jump"))
+                draw_world(renderer, world)
+                renderer.present()
+        # step() is timed on its own and taken off so this is drawing only
+        def physics():
+            world = new_world(level, {"lives": 10 ** 9, "speed_bonus": 0}, sh, sw, random.Random(0))
+            for t in range(frames):
+                step(world, ("right",) if t % 4 else ("right", "jump"))
+        drawing = max(best_time(run) - best_time(physics), 1e-9)
+        results[f"render/{name}"] = (frames / drawing, "frames/s")
+    os.close(devnull)
+    return results
+
+def bench_enemies(counts=(100, 1000, 10000), ticks=200):
+    """A crowd with every enemy type in it moving, and being removed one at
+    a time in random order (what stomping them all would cost)."""
+    results = {}
+    rng = random.Random(0)
+    for count in counts:
+        enemies = []
+        for i in range(count):
+            x = rng.randrange(10, 10000)
+            enemies.append({'x': float(x), 'y': 20.0, 'vx': rng.choice([0.5, -0.5]), 'width': 3, 'height': 1,
+                            'min_x': x - 6, 'max_x': x + 6, 'type': ENEMY_TYPES[i % len(ENEMY_TYPES)]})
+        order = list(range(count))
+        rng.shuffle(order)
+        store = EnemyStore(enemies)
+        def move():
+            for _ in range(ticks):
+                store.patrol()
+        def build():
+            return EnemyStore(enemies)
+        def remove():
+            crowd = EnemyStore(enemies)
+            for eid in order:
+                crowd.remove(eid)
+        removing = max(best_time(remove) - best_time(build), 1e-9)
+        results[f"enemies/move/{count}"] = (ticks / best_time(move), "ticks/s")
+        results[f"enemies/remove/{count}"] = (count / removing, "removes/s")
+    return results
+
+def bench_boss(boards=20000):
+    rng = random.Random(0)
+    def run():
+        for _ in range(boards):
+            generate_boss_board(rng)
+    return {"boss/boards": (boards / best_time(run), "boards/s")}
+
+def bench_save(counts=(100, 10000), checkpoints=100):
+    """Taking a checkpoint (the part the frame pays for) and resuming from a
+    save with a base and `checkpoints` deltas behind it."""
+    import tempfile
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.cgsv")
+        for count in counts:
+            level, sh, sw = stress_level(count)
+            world = new_world(level, {"lives": 3, "speed_bonus": 0}, sh, sw, random.Random(0))
+            saver = SaveGame(path, compact_every=checkpoints + 1, background=False)
+            saver.start_level(world, 11)
+            for t in range(checkpoints):
+                step(world, ("right",) if t % 4 else ("right", "jump"))
+                saver.checkpoint(world)
+            saver.close()
+            def capture():
+                for _ in range(10):
+                    capture_world(world)
+            def resume():
+                restore_world(load_save(path), {"lives": 3, "speed_bonus": 0})
+            results[f"save/capture/{count}objects"] = (10 / best_time(capture), "captures/s")
+            results[f"save/resume/{count}objects"] = (1 / best_time(resume), "resumes/s")
+    return results
+
+def run_benchmarks(quick=False):
+    """Every benchmark as {name: {"value", "unit"}}; all are higher-is-better rates."""
+    results = {}
+    if quick:
+        results.update(bench_generate(levels=(11, 50), sizes=((24, 80),), count=5))
+        results.update(bench_step(counts=(10, 100), ticks=200))
+        results.update(bench_render(frames=60))
+        results.update(bench_boss(boards=2000))
+        results.update(bench_enemies(counts=(100, 1000), ticks=50))
+        results.update(bench_save(counts=(100,), checkpoints=20))
+    else:
+        results.update(bench_generate())
+        results.update(bench_step())
+        results.update(bench_render())
+        results.update(bench_boss())
+        results.update(bench_enemies())
+        results.update(bench_save())
+    return {name: {"value": round(value, 1), "unit": unit} for name, (value, unit) in results.items()}
+
+def compare_benchmarks(results, baseline, tolerance=BENCH_TOLERANCE):
+    """Names whose rate fell more than tolerance (0.15 = 15%) below the baseline."""
+    slower = []
+    for name, old in baseline.items():
+        new = results.get(name)
+        if new is not None and new["value"] < old["value"] * (1 - tolerance):
+            slower.append(name)
+    return slower
+
+def bench_main(argv):
+    import argparse, platform
+    parser = argparse.ArgumentParser(prog="python3 -m consolegame --bench",
+                                     description="Time level generation, physics, drawing and boss boards.")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON from an earlier --out to check against")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="how much slower than the baseline counts as a regression "
+                             f"(default {BENCH_TOLERANCE}, {BENCH_QUICK_TOLERANCE} with --quick)")
+    parser.add_argument("--quick", action="store_true", help="smaller runs, for a fast check")
+    args = parser.parse_args(argv)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("quick", False) != args.quick:
+            print(f"{args.compare} is from a {'full' if args.quick else 'quick'} run: quick and full "
+                  f"runs time different sizes, so compare like with like", file=sys.stderr)
+            return 2
+        baseline = baseline["results"]
+    tolerance = args.tolerance
+    if tolerance is None:
+        tolerance = BENCH_QUICK_TOLERANCE if args.quick else BENCH_TOLERANCE
+    results = run_benchmarks(args.quick)
+    report = {"version": BENCH_VERSION, "python": platform.python_version(),
+              "numpy": load_numpy() is not None, "quick": args.quick, "results": results}
+    slower = compare_benchmarks(results, baseline, tolerance) if baseline else []
+    for name, r in results.items():
+        line = f"{name:<32} {r['value']:>12.1f} {r['unit']}"
+        if baseline and name in baseline:
+            change = r["value"] / baseline[name]["value"] - 1
+            line += f"  {change:+.0%}" + ("  REGRESSION" if name in slower else "")
+        print(line)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if slower else 0
@@ -0,0 +1,165 @@
+"""The boss fight mini-game (every 10th level)."""
+import curses, random
+from .engine import FRAME_RATE
+
+# ─── BOSS FIGHT MINI‑GAME (Tic Tac Toe style) ─────────────
+# The fight runs on an asyncio loop: one task puts up a new board every
+# BOSS_BOARD_PERIOD seconds (and lets the boss grab its O's), another
+# waits for keys and handles each one the moment it arrives. Nothing
+# polls; between keys and boards the loop sleeps. Only the 3x3 cells and
+# the score line that changed get redrawn.
+BOSS_DURATION = 20        # seconds
+BOSS_BOARD_PERIOD = 5     # seconds between new boards
+BOSS_GRAB_DELAY = 0.1     # how long a new board's O's show before the boss grabs them
+BOSS_RESULT_SECONDS = 2   # the result stays up this long (any key skips it)
+
+def generate_boss_board(rng=random):
+    new_board = []
+    for i in range(3):
+        row = []
+        for j in range(3):
+            r = rng.random()
+            if r < 0.4:
+                row.append('X')
+            elif r < 0.7:
+                row.append('O')
+            else:
+                row.append(' ')
+        new_board.append(row)
+    return new_board
+
+def screen_event_loop(screen):
+    """An asyncio loop on the screen's clock. A fake screen (no fileno)
+    gets one where waiting just moves its clock on, so a scripted boss
+    fight takes no real time."""
+    import asyncio, selectors
+    if screen.fileno() is not None:
+        return asyncio.new_event_loop()
+    selector = selectors.SelectSelector()
+
+    def select(timeout=None):
+        if timeout:
+            screen.sleep(timeout)
+        return []
+    selector.select = select
+    loop = asyncio.SelectorEventLoop(selector)
+    loop.time = screen.now
+    return loop
+
+async def read_key(screen):
+    """The next key. A real screen's loop sleeps until its fileno is
+    readable; a fake one has one scripted key per frame."""
+    import asyncio
+    key = screen.getch()
+    while key == -1:
+        fd = screen.fileno()
+        if fd is None:
+            await asyncio.sleep(1.0 / FRAME_RATE)
+        else:
+            loop = asyncio.get_running_loop()
+            ready = loop.create_future()
+            loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+            try:
+                await ready
+            finally:
+                loop.remove_reader(fd)
+        key = screen.getch()
+    return key
+
+def boss_fight(stdscr, rng=random):
+    loop = screen_event_loop(stdscr)
+    try:
+        return loop.run_until_complete(boss_game(stdscr, rng))
+    finally:
+        loop.close()
+
+async def boss_game(stdscr, rng=random):
+    import asyncio
+    board = generate_boss_board(rng)
+    score = {"X": 0, "O": 0}
+    cursor = [0, 0]
+    shown = {}      # (row, col) or "score" -> what is on screen there now
+
+    def draw():
+        lines = {"score": (1, 0, f"Your X's: {score['X']}   Boss O's: {score['O']}")}
+        for i in range(3):
+            for j in range(3):
+                cell = board[i][j]
+                text = "[" + cell + "]" if [i, j] == cursor else " " + cell + " "
+                lines[i, j] = (3 + i, 3 * j, text)
+        changed = False
+        for key, (y, x, text) in lines.items():
+            if shown.get(key) != text:
+                stdscr.addstr(y, x, text)
+                shown[key] = text
+                changed = True
+        if changed:
+            stdscr.refresh()
+
+    def winner():
+        if score["X"] >= 3:
+            return "You win the boss fight! Bonus speed awarded!", 1
+        if score["O"] >= 3:
+            return "Boss wins the mini-game! No bonus speed.", 0
+        return None
+
+    async def boards():
+        nonlocal board
+        while True:
+            draw()
+            await asyncio.sleep(BOSS_GRAB_DELAY)
+            for row in board:       # the boss collects every O
+                score["O"] += row.count('O')
+                row[:] = [' ' if cell == 'O' else cell for cell in row]
+            draw()
+            if winner():
+                return
+            await asyncio.sleep(BOSS_BOARD_PERIOD - BOSS_GRAB_DELAY)
+            board = generate_boss_board(rng)
+
+    async def keys():
+        while True:
+            key = await read_key(stdscr)
+            r, c = cursor
+            if key == curses.KEY_UP and r > 0:
+                cursor[0] -= 1
+            elif key == curses.KEY_DOWN and r < 2:
+                cursor[0] += 1
+            elif key == curses.KEY_LEFT and c > 0:
+                cursor[1] -= 1
+            elif key == curses.KEY_RIGHT and c < 2:
+                cursor[1] += 1
+            elif key in [10, 13]:
+                if board[r][c] == 'X':
+                    score["X"] += 1
+                    board[r][c] = ' '
+            elif key == ord('q'):
+                return
+            draw()
+            if winner():
+                return
+
+    stdscr.nodelay(True)
+    stdscr.clear()
+    stdscr.addstr(0, 0, "Boss Fight! Collect X's before boss collects O's!")
+    stdscr.addstr(7, 0, "Use arrow keys to move, Enter to collect. (Press q to quit)")
+    tasks = [asyncio.ensure_future(boards()), asyncio.ensure_future(keys())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=BOSS_DURATION,
+                                     return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()   # a key script running out ends the fight too
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    message, bonus = winner() or (
+        ("Time's up! You win! Bonus speed awarded!", 1) if score["X"] > score["O"]
+        else ("Time's up! Boss wins! No bonus speed.", 0))
+    stdscr.addstr(9, 0, message)
+    stdscr.refresh()
+    try:
+        await asyncio.wait_for(read_key(stdscr), BOSS_RESULT_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+    return bonus
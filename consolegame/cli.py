@@ -0,0 +1,217 @@
+"""The tool modes: --headless, --replay, --scripted, --validate and
+--build-pack."""
+import time, random, math, sys, os, json
+from .levels import build_level, load_level, write_level_pack
+from .engine import (BASE_SPEED, SOLVER_GAVE_UP, Replay, parse_input_script, run_bot, simulate,
+                     solve_level)
+
+# ─── HEADLESS RUNS (no terminal needed) ─────────────────────
+# Only the modes that draw import render and game (and so curses), inside
+# the function, so --headless and the --validate workers never load them.
+def headless_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python3 -m consolegame --headless",
+                                     description="Run a level without curses from an input script.")
+    parser.add_argument("level", type=int)
+    parser.add_argument("script", help='e.g. "R*40 RJ R*10" (L/R/J per tick, . = idle, *N = repeat), '
+                                       'or "bot" to let the bot play')
+    parser.add_argument("--size", default="24x80", help="screen size as ROWSxCOLS (default 24x80)")
+    parser.add_argument("--ticks", type=int, default=None, help="keep simulating after the script ends")
+    parser.add_argument("--seed", type=int, default=None, help="seed for heart drops and level picks")
+    parser.add_argument("--width", type=int, default=None, help="level width in columns (levels 11+ scroll)")
+    parser.add_argument("--endless", action="store_true", help="levels 11+ never end (streamed chunks)")
+    args = parser.parse_args(argv)
+    sh, sw = (int(n) for n in args.size.lower().split("x"))
+    if args.seed is not None:
+        random.seed(args.seed)
+    level = load_level(args.level, sh, sw, math.inf if args.endless else args.width)
+    game_state = {"lives": 3, "speed_bonus": 0}
+    started = time.perf_counter()
+    if args.script == "bot":
+        result, ticks, script = run_bot(level, game_state, sh, sw, args.ticks or 2000,
+                                        rng=random.Random(args.seed))
+        elapsed = time.perf_counter() - started
+        print(f"result: {result or 'timeout'}  ticks: {ticks}  lives: {game_state['lives']}")
+        print(f"bot pressed: {script}")
+    else:
+        script = parse_input_script(args.script)
+        result, ticks, events = simulate(level, game_state, sh, sw, script, args.ticks,
+                                         rng=random.Random(args.seed))
+        elapsed = time.perf_counter() - started
+        print(f"result: {result or 'timeout'}  ticks: {ticks}  lives: {game_state['lives']}")
+        print(f"events: {', '.join(name for name, _ in events if not name.startswith('chunk_')) or 'none'}")
+    print(f"speed: {ticks / elapsed if elapsed else float('inf'):.0f} ticks/s")
+    return 0 if result == "complete" else 1
+
+def replay_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python3 -m consolegame --replay",
+                                     description="Play back a recording made with --record.")
+    parser.add_argument("recording")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed multiplier (default 1)")
+    parser.add_argument("--headless", action="store_true", help="no terminal, as fast as possible")
+    parser.add_argument("--screen", choices=("curses", "ansi"), default="curses", help="how to draw")
+    args = parser.parse_args(argv)
+    replay = Replay.load(args.recording)
+    d = replay.data
+    if args.headless:
+        result, ticks, elapsed = replay.run_headless()
+        ok = result == d["result"] and ticks == d["ticks"]
+        print(f"result: {result or 'timeout'}  ticks: {ticks}  recorded: {d['result']} at {d['ticks']}")
+        print(f"speed: {ticks / elapsed if elapsed else float('inf'):.0f} ticks/s  {'in sync' if ok else 'OUT OF SYNC'}")
+        return 0 if ok else 1
+    from .render import run_on_screen
+    from .game import play_level
+
+    def watch(stdscr):
+        if stdscr.getmaxyx() != (d["sh"], d["sw"]):
+            return "wrong size"
+        level, game_state = replay.build()
+        return play_level(stdscr, level, d["level"], game_state,
+                          tick_rate=d["tick_rate"] * args.speed, replay=replay)
+
+    result = run_on_screen(args.screen, watch)
+    if result == "wrong size":
+        print(f"resize the terminal to {d['sh']}x{d['sw']} to watch this recording")
+        return 1
+    print(f"result: {result}  recorded: {d['result']}")
+    return 0 if result == d["result"] else 1
+
+def parse_key_script(script):
+    """Keys for a MemoryScreen, one token per frame: "^D" is Ctrl+D, "."
+    no key, "up"/"down"/"left"/"right"/"enter", any other single
+    character itself, and "*N" repeats a token N times."""
+    import curses
+    named = {"up": curses.KEY_UP, "down": curses.KEY_DOWN, "left": curses.KEY_LEFT,
+             "right": curses.KEY_RIGHT, "enter": 10, ".": -1}
+    keys = []
+    for token in script.split():
+        token, _, repeat = token.partition("*")
+        if token in named:
+            key = named[token]
+        elif len(token) == 2 and token[0] == "^":
+            key = ord(token[1].upper()) - 64
+        elif len(token) == 1:
+            key = ord(token)
+        else:
+            raise ValueError(f"bad key token {token!r}")
+        for _ in range(int(repeat or 1)):
+            keys.extend((key, -1) if key != -1 else (-1,))
+    return keys
+
+def run_scripted(keys, sh=24, sw=80, *main_args):
+    """Play the whole game (main) on a MemoryScreen from a key list until
+    the keys run out; returns the screen to look at."""
+    from .render import MemoryScreen, ScriptEnded, run_on_screen
+    from .game import main
+    screen = MemoryScreen(sh, sw, keys)
+    try:
+        run_on_screen(screen, main, *main_args)
+    except ScriptEnded:
+        pass
+    return screen
+
+def scripted_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python3 -m consolegame --scripted",
+                                     description="Run the whole game on an in-memory screen from scripted keys.")
+    parser.add_argument("keys", help='e.g. "^R ^D*60 ^W ^D*30" (see parse_key_script)')
+    parser.add_argument("--size", default="24x80", help="screen size as ROWSxCOLS (default 24x80)")
+    args = parser.parse_args(argv)
+    sh, sw = (int(n) for n in args.size.lower().split("x"))
+    started = time.perf_counter()
+    screen = run_scripted(parse_key_script(args.keys), sh, sw)
+    elapsed = time.perf_counter() - started
+    print("\n".join(screen.text()).rstrip())
+    print(f"game time: {screen.now():.1f}s  real: {elapsed:.2f}s  refreshes: {screen.refreshes}  "
+          f"calls: {screen.calls}  cells: {screen.chars}")
+    return 0
+
+def validate_job(job):
+    """One level for validate_main's pool: build it and find a way through.
+    The bot (graph guided, no enemies) almost always finds one in about a
+    millisecond; the full search only runs when it doesn't. The status is
+    "ok", "unbeatable", or "unknown" if the search gave up."""
+    level_num, sh, sw, width = job
+    level = build_level(level_num, sh, sw, width, rng=random.Random(level_num))
+    started = time.perf_counter()
+    result, _, script = run_bot(dict(level, enemies=[]), {"lives": 3, "speed_bonus": 0}, sh, sw,
+                                max_ticks=int(level.get("width", sw) / BASE_SPEED) * 8)
+    if result != "complete":
+        script = solve_level(level, sh, sw)
+    if script is SOLVER_GAVE_UP:
+        status, script = "unknown", None
+    else:
+        status = "ok" if script is not None else "unbeatable"
+    return level_num, level, status, script, time.perf_counter() - started
+
+def validate_main(argv):
+    import argparse, multiprocessing
+    parser = argparse.ArgumentParser(prog="python3 -m consolegame --validate",
+                                     description="Build a range of levels on every core and check each can be beaten.")
+    parser.add_argument("levels", help="level range, e.g. 11-5000")
+    parser.add_argument("--size", default="24x80", help="screen size as ROWSxCOLS (default 24x80)")
+    parser.add_argument("--width", type=int, default=None, help="level width in columns (levels 11+ scroll)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: one per core)")
+    parser.add_argument("--report", default="-", help="JSON lines file, one per level (default stdout)")
+    parser.add_argument("--pack", help="also write the beatable levels into this level pack")
+    args = parser.parse_args(argv)
+    sh, sw = (int(n) for n in args.size.lower().split("x"))
+    first, _, last = args.levels.partition("-")
+    numbers = range(int(first), int(last or first) + 1)
+    jobs = ((n, sh, sw, args.width) for n in numbers)
+    report = sys.stdout if args.report == "-" else open(args.report, "w")
+    rejected, unknown = [], []
+    started = time.perf_counter()
+
+    def beatable(results):
+        # results arrive in level order and go to disk as they come
+        for level_num, level, status, script, seconds in results:
+            report.write(json.dumps({"level": level_num, "ok": status == "ok", "status": status,
+                                     "script": script, "ms": round(seconds * 1000, 2)}) + "\n")
+            report.flush()
+            if status == "unbeatable":
+                rejected.append(level_num)
+            elif status == "unknown":
+                unknown.append(level_num)
+            else:
+                yield level_num, sh, sw, level
+
+    chunksize = max(1, min(64, len(numbers) // (args.workers * 4)))
+    with multiprocessing.Pool(args.workers) as pool:
+        results = beatable(pool.imap(validate_job, jobs, chunksize))
+        if args.pack:
+            skipped = write_level_pack(args.pack, results)
+            if skipped:
+                print(f"left levels {' '.join(map(str, skipped[:20]))} out of {args.pack}: built fresh "
+                      f"or streamed, never read from a pack", file=sys.stderr)
+        else:
+            for _ in results:
+                pass
+    if report is not sys.stdout:
+        report.close()
+    print(f"{len(numbers) - len(rejected) - len(unknown)}/{len(numbers)} levels beatable in "
+          f"{time.perf_counter() - started:.2f}s on {args.workers} workers"
+          + (f"; rejected: {' '.join(map(str, rejected[:20]))}" if rejected else "")
+          + (f"; search gave up on: {' '.join(map(str, unknown[:20]))}" if unknown else ""), file=sys.stderr)
+    return 1 if rejected or unknown else 0
+
+def build_pack_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python3 -m consolegame --build-pack",
+                                     description="Prebuild a range of levels into one pack file.")
+    parser.add_argument("out")
+    parser.add_argument("levels", help="level range, e.g. 11-500")
+    parser.add_argument("--size", default="24x80", help="screen size as ROWSxCOLS (default 24x80)")
+    args = parser.parse_args(argv)
+    sh, sw = (int(n) for n in args.size.lower().split("x"))
+    first, _, last = args.levels.partition("-")
+    numbers = range(int(first), int(last or first) + 1)
+    started = time.perf_counter()
+    skipped = write_level_pack(args.out, ((n, sh, sw, build_level(n, sh, sw)) for n in numbers))
+    print(f"{len(numbers) - len(skipped)} levels -> {args.out} ({os.path.getsize(args.out)} bytes) "
+          f"in {time.perf_counter() - started:.2f}s")
+    if skipped:
+        print(f"left out levels {' '.join(map(str, skipped[:20]))}: built fresh or streamed, "
+              f"never read from a pack", file=sys.stderr)
+    return 0
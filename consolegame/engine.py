@@ -0,0 +1,1419 @@
+"""The game with no terminal: entities, the collision grid, step(), the
+solver and bot, and recordings."""
+import time, random, math, os, json
+from array import array
+from collections import deque
+from .levels import (CHUNKS_AHEAD, CHUNKS_BEHIND, CHUNK_CACHE, CHUNK_WIDTH, ENEMY_TYPES,
+                     GENERATOR_VERSION, load_level)
+
+# ─── HELPER FUNCTION ─────────────────────────────────────
+def collides(a, b):
+    """Basic AABB collision between entities 'a' and 'b' (anything with x, y, w, h)."""
+    return (a.x < b.x + b.w and
+            a.x + a.w > b.x and
+            a.y < b.y + b.h and
+            a.y + a.h > b.y)
+
+def lerp(a, b, alpha):
+    """Linear blend from a to b; alpha 0 gives a, alpha 1 gives b."""
+    return a + (b - a) * alpha
+
+# ─── GAME LOOP SCHEDULER ─────────────────────────────────
+TICK_RATE = 20          # physics steps per second (the old 0.05 s sleep)
+FRAME_RATE = 30         # redraws per second we aim for (0 = as fast as possible)
+MAX_CATCHUP_TICKS = 5   # most ticks run in one frame before time is dropped
+
+class GameClock:
+    """Fixed-timestep clock: physics runs at tick_rate no matter how long a
+    frame takes, and alpha says how far the frame is between two ticks."""
+    def __init__(self, tick_rate=TICK_RATE, frame_rate=FRAME_RATE,
+                 max_catchup=MAX_CATCHUP_TICKS, timer=time.monotonic, sleep=time.sleep):
+        self.dt = 1.0 / tick_rate
+        self.frame_dt = 1.0 / frame_rate if frame_rate else 0.0
+        self.max_catchup = max_catchup
+        self.timer = timer
+        self.sleep = sleep
+        self.tick = 0           # ticks run so far
+        self.dropped = 0.0      # seconds thrown away by the catch-up limit
+        self.accumulator = 0.0
+        self.last = timer()
+        self.frame_start = self.last
+
+    def reset(self):
+        """Forget time spent outside the loop (pause screens, level intro)."""
+        self.last = self.timer()
+        self.frame_start = self.last
+        self.accumulator = 0.0
+
+    def ticks(self):
+        """How many fixed steps are due since the last call, capped so a long
+        stall can't make the next frame run hundreds of ticks (spiral of death)."""
+        now = self.timer()
+        self.accumulator += now - self.last
+        self.last = now
+        due = int(self.accumulator / self.dt)
+        if due > self.max_catchup:
+            self.dropped += (due - self.max_catchup) * self.dt
+            due = self.max_catchup
+            self.accumulator = self.dt * due
+        self.accumulator -= due * self.dt
+        self.tick += due
+        return due
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.dt, 1.0)
+
+    def wait(self):
+        """Sleep out whatever is left of this frame's budget."""
+        if self.frame_dt:
+            remaining = self.frame_start + self.frame_dt - self.timer()
+            if remaining > 0:
+                self.sleep(remaining)
+        self.frame_start = self.timer()
+
+# ─── FRAME PROFILER ──────────────────────────────────────
+# Off unless asked for: play_level only makes one when the overlay is on or
+# a trace file was given, and step() only times phases when world["profile"]
+# is set.
+PROFILE_PHASES = ("input", "physics", "platforms", "enemies", "planes", "lava",
+                  "hearts", "goal", "draw", "refresh")
+PROFILE_WINDOW = 120    # frames the overlay's numbers are taken over
+
+class FrameProfiler:
+    """Per-phase wall time of each frame. mark(phase) books the time since
+    the previous mark to that phase; ticks run inside a frame add up.
+    end(dropped) also books the game time the clock threw away that frame
+    (GameClock.dropped), which is how far the game fell behind real time."""
+    def __init__(self, trace=False, timer=time.perf_counter):
+        self.timer = timer
+        self.recent = deque(maxlen=PROFILE_WINDOW)
+        self.trace = [] if trace else None   # every frame, for dump()
+        self.phases = None
+        self.start = self.last = None
+        self.prev_start = None
+        self.intervals = deque(maxlen=PROFILE_WINDOW)  # start to start, for FPS
+
+    def begin(self):
+        now = self.timer()
+        self.phases = dict.fromkeys(PROFILE_PHASES, 0.0)
+        self.start = self.last = now
+
+    def mark(self, phase):
+        now = self.timer()
+        self.phases[phase] += now - self.last
+        self.last = now
+
+    def end(self, dropped=0.0):
+        row = self.phases
+        row["frame"] = self.last - self.start
+        row["dropped"] = dropped
+        if self.prev_start is not None:
+            self.intervals.append(self.start - self.prev_start)
+        self.prev_start = self.start
+        self.recent.append(row)
+        if self.trace is not None:
+            self.trace.append(row)
+
+    def overlay(self):
+        """Two HUD lines: FPS, frame time percentiles and game time dropped over
+        the window, then mean ms per phase."""
+        if not self.recent:
+            return "profiling...", ""
+        times = sorted(row["frame"] for row in self.recent)
+        p50 = times[len(times) // 2]
+        p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+        fps = len(self.intervals) / sum(self.intervals) if self.intervals else 0.0
+        n = len(self.recent)
+        phases = "  ".join(f"{phase[:4]} {sum(row[phase] for row in self.recent) / n * 1000:.2f}"
+                           for phase in PROFILE_PHASES)
+        dropped = sum(row["dropped"] for row in self.recent)
+        return (f"FPS {fps:.0f}  p50 {p50 * 1000:.2f}ms  p99 {p99 * 1000:.2f}ms  dropped {dropped * 1000:.0f}ms",
+                phases)
+
+    def dump(self, path):
+        """Write the trace as CSV, or JSON if path ends in .json (times in ms)."""
+        columns = ("frame",) + PROFILE_PHASES + ("dropped",)
+        rows = [[round(row[c] * 1000, 4) for c in columns] for row in self.trace or ()]
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            if path.endswith(".json"):
+                json.dump({"columns": columns, "unit": "ms", "frames": rows}, f)
+            else:
+                f.write(",".join(columns) + "\n")
+                for row in rows:
+                    f.write(",".join(map(str, row)) + "\n")
+        os.replace(tmp, path)
+
+# ─── ENTITIES ──────────────────────────────────────────────
+# Levels are still built and shown as plain dicts; new_world() turns them
+# into these for the engine and sync_level() writes them back.
+class Rect:
+    """A platform, plane, lava strip or goal: never moves."""
+    __slots__ = ('x', 'y', 'w', 'h')
+    def __init__(self, x, y, w, h):
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+
+    @classmethod
+    def from_dict(cls, d):
+        w, h = extent(d)
+        return cls(d['x'], d['y'], w, h)
+
+    def to_dict(self, w_key='w', h_key='h'):
+        return {'x': self.x, 'y': self.y, w_key: self.w, h_key: self.h}
+
+class Player:
+    __slots__ = ('x', 'y', 'vx', 'vy', 'w', 'h', 'jumping')
+    def __init__(self, x, y, vx=0.0, vy=0.0, w=3, h=2, jumping=False):
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.w = w
+        self.h = h
+        self.jumping = jumping
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['x'], d['y'], d['vx'], d['vy'], d['width'], d['height'], d['jumping'])
+
+    def to_dict(self):
+        return {'x': self.x, 'y': self.y, 'vx': self.vx, 'vy': self.vy,
+                'width': self.w, 'height': self.h, 'jumping': self.jumping}
+
+numpy = None        # set by load_numpy(); importing it takes longer than the rest of the game
+
+def load_numpy():
+    """Import NumPy the first time a column store is built, along with the
+    fly table. Returns None if it isn't installed: the array module does the
+    same job, just without vector maths."""
+    global numpy, FLY_TABLE
+    if FLY_TABLE is None:
+        try:
+            import numpy
+        except ImportError:
+            pass
+        FLY_TABLE = float_array(FLY_PATH)
+    return numpy
+
+def float_array(values):
+    """A compact float column: NumPy when it's installed, array('d') if not."""
+    if numpy is not None:
+        return numpy.array(values, dtype=float)
+    return array('d', values)
+
+def append_to(column, value):
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        return numpy.append(column, value)
+    column.append(value)
+    return column
+
+def delete_at(column, i):
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        return numpy.delete(column, i)
+    del column[i]
+    return column
+
+def drop_last(column):
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        return column[:-1]
+    column.pop()
+    return column
+
+# Each enemy type moves its own way. Basic enemies walk back and forth
+# between min_x and max_x. Flying ones walk too while bobbing along
+# FLY_PATH, a sine wave worked out once so every tick is a table lookup
+# (and comes out the same with or without NumPy). Slimes sit for
+# SLIME_REST ticks, then hop, only moving sideways while in the air.
+FLY_PERIOD = 40           # ticks per bob
+FLY_HEIGHT = 3.0          # rows above its starting height at the top of a bob
+FLY_PATH = [FLY_HEIGHT * (1 - math.cos(2 * math.pi * t / FLY_PERIOD)) / 2 for t in range(FLY_PERIOD)]
+FLY_TABLE = None          # FLY_PATH as a column, built by load_numpy()
+SLIME_REST = 10           # ticks on the ground between hops
+SLIME_HOP = -1.5          # upward speed a hop starts with
+SLIME_GRAVITY = 0.25
+ENEMY_RISE = {'basic': 0.0,                                   # how far above its start an
+              'slime': SLIME_HOP ** 2 / (2 * SLIME_GRAVITY),  # enemy of each type can get
+              'flying': FLY_HEIGHT}
+
+class EnemyStore:
+    """All of a level's enemies as parallel columns (structure of arrays).
+    Rows are kept grouped by type, blocks[type] being its [start, end), so
+    patrol() moves each type in a single pass over its block. Each enemy
+    has a stable id that survives other enemies being removed; slot[id] is
+    its current row. remove() fills the hole with the last row of the
+    block (and each later block shifts down one by moving its own last
+    row), so it costs the same however many enemies there are."""
+    COLUMNS = ('x', 'y', 'vx', 'w', 'h', 'min_x', 'max_x', 'base_y', 'vy', 'phase')
+
+    def __init__(self, enemies=(), ids=None, next_id=None):
+        load_numpy()
+        enemies = list(enemies)
+        if ids is None:
+            ids = range(len(enemies))
+        order = sorted(range(len(enemies)), key=lambda i: ENEMY_TYPES.index(enemies[i].get('type', 'basic')))
+        enemies = [enemies[i] for i in order]
+        self.x = float_array([e['x'] for e in enemies])
+        self.y = float_array([e['y'] for e in enemies])
+        self.vx = float_array([e['vx'] for e in enemies])
+        self.w = float_array([e['width'] for e in enemies])
+        self.h = float_array([e['height'] for e in enemies])
+        self.min_x = float_array([e['min_x'] for e in enemies])
+        self.max_x = float_array([e['max_x'] for e in enemies])
+        self.base_y = float_array([e.get('base_y', e['y']) for e in enemies])
+        self.vy = float_array([e.get('vy', 0.0) for e in enemies])
+        self.phase = float_array([e.get('phase', 0.0) for e in enemies])
+        self.type = [e.get('type', 'basic') for e in enemies]
+        self.ids = [ids[i] for i in order]
+        self.next_id = len(enemies) if next_id is None else next_id
+        self.slot = {eid: i for i, eid in enumerate(self.ids)}
+        self.blocks = {}
+        start = 0
+        for kind in ENEMY_TYPES:
+            end = start + self.type.count(kind)
+            self.blocks[kind] = [start, end]
+            start = end
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _move(self, src, dst):
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[dst] = column[src]
+        eid = self.ids[dst] = self.ids[src]
+        self.type[dst] = self.type[src]
+        self.slot[eid] = dst
+
+    def add(self, e):
+        """Add an enemy dict at the end of its type's block; returns its id."""
+        kind = e.get('type', 'basic')
+        for name in self.COLUMNS:
+            setattr(self, name, append_to(getattr(self, name), 0.0))
+        self.ids.append(None)
+        self.type.append(None)
+        hole = len(self.ids) - 1
+        for later in reversed(ENEMY_TYPES[ENEMY_TYPES.index(kind) + 1:]):
+            block = self.blocks[later]
+            if block[0] != block[1]:
+                self._move(block[0], hole)   # its first row goes to its new end
+                hole = block[0]
+            block[0] += 1
+            block[1] += 1
+        eid = self.next_id
+        self.next_id += 1
+        values = (e['x'], e['y'], e['vx'], e['width'], e['height'], e['min_x'], e['max_x'],
+                  e.get('base_y', e['y']), e.get('vy', 0.0), e.get('phase', 0.0))
+        for name, value in zip(self.COLUMNS, values):
+            getattr(self, name)[hole] = value
+        self.ids[hole] = eid
+        self.type[hole] = kind
+        self.slot[eid] = hole
+        self.blocks[kind][1] += 1
+        return eid
+
+    def remove(self, eid):
+        hole = self.slot.pop(eid)
+        kind = self.type[hole]
+        for later in ENEMY_TYPES[ENEMY_TYPES.index(kind):]:
+            block = self.blocks[later]
+            if later != kind:
+                block[0] -= 1
+            if block[0] != block[1]:
+                last = block[1] - 1
+                if last != hole:
+                    self._move(last, hole)
+                hole = last
+            block[1] -= 1
+        for name in self.COLUMNS:
+            setattr(self, name, drop_last(getattr(self, name)))
+        self.ids.pop()
+        self.type.pop()
+
+    def patrol(self, rows=None):
+        """Move enemies one tick, each type by its own rule. rows limits it
+        to those rows; the rest stand still."""
+        if rows is not None:
+            rows = numpy.fromiter(rows, dtype=int) if numpy is not None else sorted(rows)
+        for kind, (start, end) in self.blocks.items():
+            if start == end:
+                continue
+            if rows is None:
+                sel = slice(start, end) if numpy is not None else range(start, end)
+            elif numpy is not None:
+                sel = rows[(rows >= start) & (rows < end)]
+            else:
+                sel = [i for i in rows if start <= i < end]
+            ENEMY_MOVES[kind](self, sel)
+
+    def _walk(self, sel):
+        x, vx = self.x, self.vx
+        w, min_x, max_x = self.w, self.min_x, self.max_x
+        if numpy is not None:
+            x[sel] += vx[sel]
+            moved, speed = x[sel], vx[sel]
+            numpy.negative(speed, out=speed, where=(moved < min_x[sel]) | (moved + w[sel] > max_x[sel]))
+            vx[sel] = speed
+            return
+        for i in sel:
+            x[i] += vx[i]
+            if x[i] < min_x[i] or x[i] + w[i] > max_x[i]:
+                vx[i] *= -1
+
+    def _fly(self, sel):
+        self._walk(sel)
+        phase, y, base_y = self.phase, self.y, self.base_y
+        if numpy is not None:
+            step = phase[sel] + 1
+            numpy.subtract(step, FLY_PERIOD, out=step, where=step >= FLY_PERIOD)
+            phase[sel] = step
+            y[sel] = base_y[sel] - FLY_TABLE[step.astype(int)]
+            return
+        for i in sel:
+            step = phase[i] + 1
+            if step >= FLY_PERIOD:
+                step -= FLY_PERIOD
+            phase[i] = step
+            y[i] = base_y[i] - FLY_PATH[int(step)]
+
+    def _hop(self, sel):
+        x, y, vx, vy, phase = self.x, self.y, self.vx, self.vy, self.phase
+        w, min_x, max_x, base_y = self.w, self.min_x, self.max_x, self.base_y
+        if numpy is not None:
+            # Slimes still resting count down; the rest move with every
+            # step multiplied by go (1.0 or 0.0), which leaves resting
+            # ones exactly where they were.
+            rest, xs, ys, vys, speed, ground = phase[sel], x[sel], y[sel], vy[sel], vx[sel], base_y[sel]
+            resting = rest > 0
+            go = (~resting).astype(float)
+            numpy.subtract(rest, 1, out=rest, where=resting)
+            numpy.copyto(vys, SLIME_HOP, where=~resting & (ys >= ground))
+            xs += speed * go
+            vys += SLIME_GRAVITY * go
+            ys += vys * go
+            landed = ~resting & (ys >= ground)
+            numpy.copyto(ys, ground, where=landed)
+            numpy.copyto(vys, 0.0, where=landed)
+            numpy.copyto(rest, SLIME_REST, where=landed)
+            numpy.negative(speed, out=speed, where=~resting & ((xs < min_x[sel]) | (xs + w[sel] > max_x[sel])))
+            phase[sel], x[sel], y[sel], vy[sel], vx[sel] = rest, xs, ys, vys, speed
+            return
+        for i in sel:
+            if phase[i] > 0:
+                phase[i] -= 1
+                continue
+            if y[i] >= base_y[i]:
+                vy[i] = SLIME_HOP
+            x[i] += vx[i]
+            vy[i] += SLIME_GRAVITY
+            y[i] += vy[i]
+            if y[i] >= base_y[i]:
+                y[i] = base_y[i]
+                vy[i] = 0.0
+                phase[i] = SLIME_REST
+            if x[i] < min_x[i] or x[i] + w[i] > max_x[i]:
+                vx[i] *= -1
+
+    def to_dict(self, i):
+        return {'x': float(self.x[i]), 'y': float(self.y[i]), 'vx': float(self.vx[i]),
+                'width': int(self.w[i]), 'height': int(self.h[i]),
+                'min_x': float(self.min_x[i]), 'max_x': float(self.max_x[i]),
+                'type': self.type[i], 'base_y': float(self.base_y[i]),
+                'vy': float(self.vy[i]), 'phase': float(self.phase[i])}
+
+    def to_dicts(self):
+        """Every enemy in the order they were added (rows aren't)."""
+        return [self.to_dict(i) for _, i in sorted(self.slot.items())]
+
+ENEMY_MOVES = {'basic': EnemyStore._walk, 'slime': EnemyStore._hop, 'flying': EnemyStore._fly}
+
+class HeartStore:
+    """Bonus hearts as parallel columns, like EnemyStore. Hearts are always
+    one cell."""
+    def __init__(self, hearts=()):
+        load_numpy()
+        hearts = list(hearts)
+        self.x = float_array([h['x'] for h in hearts])
+        self.y = float_array([h['y'] for h in hearts])
+        self.vx = float_array([h['vx'] for h in hearts])
+        self.symbol = [h['symbol'] for h in hearts]
+        self.ids = list(range(len(hearts)))
+        self.next_id = len(hearts)
+        self.slot = {hid: i for i, hid in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, x, y, vx, symbol):
+        hid = self.next_id
+        self.next_id += 1
+        self.x = append_to(self.x, x)
+        self.y = append_to(self.y, y)
+        self.vx = append_to(self.vx, vx)
+        self.symbol.append(symbol)
+        self.slot[hid] = len(self.ids)
+        self.ids.append(hid)
+        return hid
+
+    def remove(self, hid):
+        i = self.slot.pop(hid)
+        self.x = delete_at(self.x, i)
+        self.y = delete_at(self.y, i)
+        self.vx = delete_at(self.vx, i)
+        del self.symbol[i]
+        del self.ids[i]
+        for j in range(i, len(self.ids)):
+            self.slot[self.ids[j]] = j
+
+    def drift(self, sw):
+        """Move every heart one tick; returns the ids that left the screen."""
+        x = self.x
+        if numpy is not None:
+            x += self.vx
+            gone = numpy.nonzero((x < 0) | (x > sw))[0]
+        else:
+            vx = self.vx
+            gone = []
+            for i in range(len(x)):
+                x[i] += vx[i]
+                if x[i] < 0 or x[i] > sw:
+                    gone.append(i)
+        return [self.ids[i] for i in gone]
+
+    def to_dict(self, i):
+        return {"x": float(self.x[i]), "y": float(self.y[i]), "vx": float(self.vx[i]),
+                "symbol": self.symbol[i]}
+
+    def to_dicts(self):
+        return [self.to_dict(i) for i in range(len(self.ids))]
+
+# ─── BROAD PHASE (uniform grid) ────────────────────────────
+GRID_CELL = 8           # columns/rows per grid cell
+BROAD_PHASE_MIN = 16    # below this many objects a plain loop is faster
+
+def extent(obj):
+    """Width and height of anything in a level dict (platforms use w/h,
+    movers use width/height, hearts are a single cell)."""
+    return obj.get('w', obj.get('width', 1)), obj.get('h', obj.get('height', 1))
+
+def patrol_box(enemies, i):
+    """Everywhere enemy i can be while it moves between min_x and max_x
+    (padded by one step of overshoot before it turns round), from as high
+    as its type can hop or fly (ENEMY_RISE) down to where it started.
+    Enemies are filed under this once, so moving never touches the grid."""
+    pad = abs(enemies.vx[i])
+    left = min(enemies.min_x[i], enemies.x[i]) - pad
+    right = max(enemies.max_x[i], enemies.x[i] + enemies.w[i]) + pad
+    rise = ENEMY_RISE[enemies.type[i]]
+    return left, enemies.base_y[i] - rise, right - left, enemies.h[i] + rise
+
+class BroadPhase:
+    """Uniform grid of integer keys. Keys only ever grow as things are added
+    and match their order in the level, so scan() can hand back nearby keys
+    in the same order a full loop would. Small sets skip the grid and just
+    loop."""
+    def __init__(self, boxes=(), cell=GRID_CELL, min_objects=BROAD_PHASE_MIN):
+        self.cell = cell
+        self.min_objects = min_objects
+        self.gridded = False
+        self.buckets = {}   # (cx, cy) -> set of keys
+        self.boxes = {}     # key -> (x, y, w, h) it is filed under
+        self.where = {}     # key -> (cx0, cx1, cy0, cy1) range of cells it sits in
+        for key, box in boxes:
+            self.add(key, box)
+
+    def _bounds(self, x, y, w, h):
+        c = self.cell
+        return int(x // c), int((x + w) // c), int(y // c), int((y + h) // c)
+
+    def _link(self, key, bounds):
+        buckets = self.buckets
+        cx0, cx1, cy0, cy1 = bounds
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = buckets.get((cx, cy))
+                if bucket is None:
+                    buckets[(cx, cy)] = {key}
+                else:
+                    bucket.add(key)
+        self.where[key] = bounds
+
+    def _unlink(self, key):
+        buckets = self.buckets
+        cx0, cx1, cy0, cy1 = self.where.pop(key)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = buckets[(cx, cy)]
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[(cx, cy)]
+
+    def _build_grid(self):
+        self.gridded = True
+        for key, box in self.boxes.items():
+            self._link(key, self._bounds(*box))
+
+    def add(self, key, box):
+        self.boxes[key] = box
+        if self.gridded:
+            self._link(key, self._bounds(*box))
+        elif len(self.boxes) > self.min_objects:
+            self._build_grid()
+
+    def remove(self, key):
+        if self.boxes.pop(key, None) is None:
+            return
+        if key in self.where:
+            self._unlink(key)
+
+    def move(self, key, box):
+        self.boxes[key] = box
+        if not self.gridded:
+            return
+        bounds = self._bounds(*box)
+        if bounds != self.where[key]:
+            self._unlink(key)
+            self._link(key, bounds)
+
+    def query(self, x, y, w, h):
+        """Keys of everything sharing a grid cell with the box (a superset of
+        what actually overlaps it; callers still do the exact test)."""
+        found = set()
+        buckets = self.buckets
+        cx0, cx1, cy0, cy1 = self._bounds(x, y, w, h)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = buckets.get((cx, cy))
+                if bucket:
+                    found |= bucket
+        return found
+
+    def scan(self, player):
+        """Keys near the player, in level order. The box reaches back up by
+        vy so a falling player still finds the platform it passed through.
+        If the player moves between yields (landing, respawn) the rest of
+        the scan looks around the new spot instead."""
+        if not self.gridded:
+            yield from list(self.boxes)
+            return
+        done = -1
+        while True:
+            pos = (player.x, player.y)
+            reach = max(player.vy, 0)
+            keys = sorted(k for k in self.query(player.x, player.y - reach,
+                                                player.w, player.h + reach)
+                          if k > done)
+            for key in keys:
+                done = key
+                if key not in self.boxes:
+                    continue  # removed while we were scanning
+                yield key
+                if (player.x, player.y) != pos:
+                    break
+            else:
+                return
+
+def build_broad_phase(world, min_objects=BROAD_PHASE_MIN, kinds=None):
+    """A BroadPhase for each kind of thing in the world (or just kinds)."""
+    def rects(kind):
+        return BroadPhase(((key, (r.x, r.y, r.w, r.h)) for key, r in world[kind].items()),
+                          min_objects=min_objects)
+    enemies = world["enemies"]
+    hearts = world["bonus_hearts"]
+    build = {
+        "platforms": lambda: rects("platforms"),
+        "planes": lambda: rects("planes"),
+        "lava": lambda: rects("lava"),
+        # by id, not row: rows get shuffled by remove() but a small set's
+        # scan() goes in the order keys were added
+        "enemies": lambda: BroadPhase(((eid, patrol_box(enemies, i)) for eid, i in sorted(enemies.slot.items())),
+                                      min_objects=min_objects),
+        "bonus_hearts": lambda: BroadPhase(((hid, (hearts.x[i], hearts.y[i], 1, 1))
+                                            for i, hid in enumerate(hearts.ids)),
+                                           min_objects=min_objects),
+    }
+    return {kind: make() for kind, make in build.items() if kinds is None or kind in kinds}
+
+# ─── SIMULATION ENGINE (no curses) ─────────────────────────
+# The rules of the game live here so they can run without a terminal:
+# play_level feeds them key presses, and simulate() feeds them a script.
+PLAYER_SPAWN_X = 5.0
+JUMP_VELOCITY = -5.0
+GRAVITY = 0.5
+BASE_SPEED = 1.5
+STOMP_BOUNCE = -3
+HEART_DROP_CHANCE = 0.1
+WAKE_MARGIN = 20    # columns past each screen edge where enemies keep walking
+
+def camera_x(x, sw, width):
+    """Left edge of the view when the player stands at x: keep them a third
+    of the way in, but never show past either end of the level."""
+    return max(0, min(int(x) - sw // 3, width - sw))
+
+def new_world(level, game_state, sh, sw, rng=None, players=1):
+    """Turn a level dict into everything step() needs. rng defaults to the
+    random module so interactive play behaves exactly as before; pass a
+    Random for replays. With players > 1 everyone starts at the spawn a few
+    columns apart and has their own lives in game_state["player_lives"]."""
+    player = Player.from_dict(level["player"])
+    world = {"level": level, "state": game_state, "sh": sh, "sw": sw,
+             "width": level.get("width", sw), "tick": 0, "rng": rng if rng is not None else random,
+             "player": player,
+             "players": [player],
+             "lives": None,
+             "out": set(),
+             # key -> Rect; keys come from next_key so they keep growing
+             # as streamed chunks add more
+             "platforms": {},
+             "planes": {},
+             "lava": {},
+             "next_key": 0,
+             "goal": Rect.from_dict(level["goal"]) if level.get("goal") else None,
+             "enemies": EnemyStore(level["enemies"]),
+             "bonus_hearts": HeartStore(level["bonus_hearts"]),
+             "profile": None}   # a FrameProfiler while profiling
+    for kind in ("platforms", "planes", "lava"):
+        for d in level.get(kind, []):
+            world[kind][world["next_key"]] = Rect.from_dict(d)
+            world["next_key"] += 1
+    if players > 1:
+        for i in range(1, players):
+            other = Player.from_dict(level["player"])
+            other.x += 4 * i
+            world["players"].append(other)
+        lives = game_state.setdefault("player_lives", [3] * players)
+        world["lives"] = lives
+        world["out"] = {i for i, n in enumerate(lives) if n <= 0}
+    world["broad"] = build_broad_phase(world)
+    if "stream" in level:
+        world["stream"] = {"level": level["stream"]["level"],
+                           "chunks": level["stream"]["chunks"],
+                           "cache": CHUNK_CACHE, "live": {}}
+        stream_chunks(world)
+    return world
+
+def sync_level(world):
+    """Write the moving parts of the world back into its level dict."""
+    level = world["level"]
+    level["player"].update(world["player"].to_dict())
+    level["enemies"][:] = world["enemies"].to_dicts()
+    level["bonus_hearts"][:] = world["bonus_hearts"].to_dicts()
+    return level
+
+def load_chunk(world, chunk, enemy_ids=None):
+    """Add a chunk's geometry and enemies to the world. enemy_ids says the
+    enemies are already there under those ids (restoring a save)."""
+    live = {"chunk": chunk, "platforms": [], "planes": [], "lava": [], "enemies": []}
+    broad = world["broad"]
+    for kind in ("platforms", "planes", "lava"):
+        for d in chunk[kind]:
+            key = world["next_key"]
+            world["next_key"] += 1
+            rect = Rect.from_dict(d)
+            world[kind][key] = rect
+            broad[kind].add(key, (rect.x, rect.y, rect.w, rect.h))
+            live[kind].append(key)
+    enemies = world["enemies"]
+    if enemy_ids is not None:
+        live["enemies"].extend(enemy_ids)
+        world["stream"]["live"][chunk["index"]] = live
+        return
+    for d in chunk["enemies"]:
+        eid = enemies.add(d)
+        broad["enemies"].add(eid, patrol_box(enemies, enemies.slot[eid]))
+        live["enemies"].append(eid)
+    world["stream"]["live"][chunk["index"]] = live
+
+def unload_chunk(world, index):
+    live = world["stream"]["live"].pop(index)
+    broad = world["broad"]
+    for kind in ("platforms", "planes", "lava"):
+        for key in live[kind]:
+            del world[kind][key]
+            broad[kind].remove(key)
+    enemies = world["enemies"]
+    for eid in live["enemies"]:
+        if eid in enemies.slot:  # not stomped yet
+            enemies.remove(eid)
+            broad["enemies"].remove(eid)
+    return live["chunk"]
+
+def stream_chunks(world):
+    """Load the chunks around the camera and drop the ones far behind.
+    Returns ("chunk_loaded"/"chunk_unloaded", chunk) events."""
+    stream = world["stream"]
+    cache = stream["cache"]
+    sh = world["sh"]
+    sw = world["sw"]
+    cam = camera_x(view_x(world), sw, world["width"])
+    first = max(0, cam // CHUNK_WIDTH - CHUNKS_BEHIND)
+    last = (cam + sw) // CHUNK_WIDTH + CHUNKS_AHEAD
+    if stream["chunks"] is not None:
+        last = min(last, stream["chunks"] - 1)
+    live = stream["live"]
+    events = []
+    if stream.get("window") == (first, last):
+        return events
+    stream["window"] = (first, last)
+    for index in sorted(live):
+        # One chunk of slack either side so walking back and forth over a
+        # chunk edge doesn't drop and rebuild the same chunk every tick.
+        if index < first - 1 or index > last + 1:
+            events.append(("chunk_unloaded", unload_chunk(world, index)))
+    for index in range(first, last + 1):
+        if index not in live:
+            chunk = cache.get(stream["level"], index, sh)
+            load_chunk(world, chunk)
+            events.append(("chunk_loaded", chunk))
+    ahead = range(last + 1, last + 1 + CHUNKS_AHEAD)
+    if stream["chunks"] is not None:
+        ahead = range(last + 1, min(last + 1 + CHUNKS_AHEAD, stream["chunks"]))
+    cache.prefetch(stream["level"], ahead, sh)
+    return events
+
+def effective_speed(game_state):
+    return BASE_SPEED + game_state.get("speed_bonus", 0)
+
+def respawn_player(player, sh):
+    player.x = PLAYER_SPAWN_X
+    player.y = sh - 5
+    player.vx = 0
+    player.vy = 0
+    player.jumping = False
+
+def view_x(world):
+    """The x the camera follows: the player, or the middle of the players
+    still in the game."""
+    players = world["players"]
+    if len(players) == 1:
+        return players[0].x
+    xs = [p.x for i, p in enumerate(players) if i not in world["out"]] or [players[0].x]
+    return sum(xs) / len(xs)
+
+def step(world, inputs=()):
+    """Advance the world by one tick. inputs is any iterable of "left",
+    "right" and "jump" (in a multiplayer world, one such iterable per
+    player). Returns a list of (event, detail) tuples; a "game_over" or
+    "complete" event ends the level. In a multiplayer world the detail of
+    a player's event is (player index, detail).
+
+    Each phase runs for every player before the next one starts, so the
+    enemies patrol once and hearts drift once per tick however many
+    players there are."""
+    game_state = world["state"]
+    sh = world["sh"]
+    sw = world["sw"]
+    players = world["players"]
+    lives = world["lives"]      # per player, or None: one player on game_state["lives"]
+    out = world["out"]          # players with no lives left
+    enemies = world["enemies"]
+    hearts = world["bonus_hearts"]
+    broad = world["broad"]
+    prof = world["profile"]
+    events = []
+    world["tick"] += 1
+    if "stream" in world:
+        events.extend(stream_chunks(world))
+    if lives is None:
+        inputs = (inputs,)
+        active = (0,)
+    else:
+        active = [i for i in range(len(players)) if i not in out]
+
+    def tag(i, detail):
+        return detail if lives is None else (i, detail)
+
+    def lose_life(i, cause):
+        """True when this ends the level."""
+        if lives is None:
+            game_state["lives"] -= 1
+            left = game_state["lives"]
+        else:
+            lives[i] -= 1
+            left = lives[i]
+        events.append(("life_lost", tag(i, cause)))
+        if left <= 0:
+            if lives is not None:
+                out.add(i)
+                events.append(("player_out", tag(i, cause)))
+                if len(out) < len(players):
+                    return False
+            events.append(("game_over", tag(i, cause)))
+            return True
+        respawn_player(players[i], sh)
+        return False
+
+    prev_y = [0.0] * len(players)
+    speed = effective_speed(game_state)
+    for i in active:
+        player = players[i]
+        for action in inputs[i]:
+            if action == "left":
+                player.vx = -speed
+            elif action == "right":
+                player.vx = speed
+            elif action == "jump":
+                if not player.jumping:
+                    player.vy = JUMP_VELOCITY
+                    player.jumping = True
+
+        prev_y[i] = player.y
+
+        # Apply gravity and update player.
+        player.vy += GRAVITY
+        player.x += player.vx
+        player.y += player.vy
+        player.vx = 0  # a key press moves the player for one tick
+    if prof:
+        prof.mark("physics")
+
+    # Platform collision.
+    platforms = world["platforms"]
+    for i in active:
+        player = players[i]
+        for key in broad["platforms"].scan(player):
+            plat = platforms[key]
+            if (player.x + player.w > plat.x and
+                player.x < plat.x + plat.w):
+                if (player.vy >= 0 and 
+                    player.y + player.h >= plat.y and
+                    player.y + player.h - player.vy <= plat.y):
+                    player.y = plat.y - player.h
+                    player.vy = 0
+                    player.jumping = False
+
+        # Out-of-screen fall.
+        if player.y > sh:
+            if lose_life(i, "fall"):
+                return events
+    if prof:
+        prof.mark("platforms")
+
+    # Enemy patrol, then collisions and stomping against the ones nearby.
+    # In a level wider than the screen only enemies near the view walk; the
+    # rest sleep where they are until the camera comes back.
+    if world["width"] > sw and broad["enemies"].gridded:
+        left = camera_x(view_x(world), sw, world["width"]) - WAKE_MARGIN
+        awake = broad["enemies"].query(left, 0, sw + 2 * WAKE_MARGIN, sh)
+        enemies.patrol(enemies.slot[eid] for eid in awake)
+    else:
+        enemies.patrol()
+    for i in active:
+        player = players[i]
+        for eid in broad["enemies"].scan(player):
+            j = enemies.slot[eid]
+            ex = enemies.x[j]
+            ey = enemies.y[j]
+            collision = (player.x < ex + enemies.w[j] and
+                         player.x + player.w > ex and
+                         player.y < ey + enemies.h[j] and
+                         player.y + player.h > ey)
+            if collision:
+                if (player.vy > 0) and (prev_y[i] + player.h <= ey + 1):
+                    stomped = enemies.to_dict(j)
+                    enemies.remove(eid)
+                    broad["enemies"].remove(eid)
+                    player.vy = STOMP_BOUNCE
+                    events.append(("stomp", tag(i, stomped)))
+                    if world["rng"].random() < HEART_DROP_CHANCE:
+                        hid = hearts.add(stomped['x'], stomped['y'], -0.2, "♡")
+                        broad["bonus_hearts"].add(hid, (stomped['x'], stomped['y'], 1, 1))
+                        events.append(("heart_dropped", hearts.to_dict(hearts.slot[hid])))
+                else:
+                    if lose_life(i, "enemy"):
+                        return events
+                    if i in out:
+                        break
+    if prof:
+        prof.mark("enemies")
+
+    # Hazard collisions: planes.
+    planes = world["planes"]
+    for i in active:
+        for key in broad["planes"].scan(players[i]):
+            if collides(players[i], planes[key]):
+                if lose_life(i, "plane"):
+                    return events
+                if i in out:
+                    break
+    if prof:
+        prof.mark("planes")
+
+    # Hazard collisions: lava (any overlap is lethal).
+    lava = world["lava"]
+    for i in active:
+        for key in broad["lava"].scan(players[i]):
+            if collides(players[i], lava[key]):
+                if lose_life(i, "lava"):
+                    return events
+                if i in out:
+                    break
+    if prof:
+        prof.mark("lava")
+
+    # Bonus hearts movement.
+    if len(hearts):
+        for hid in hearts.drift(world["width"]):
+            hearts.remove(hid)
+            broad["bonus_hearts"].remove(hid)
+        for j, hid in enumerate(hearts.ids):
+            broad["bonus_hearts"].move(hid, (hearts.x[j], hearts.y[j], 1, 1))
+        for i in active:
+            if i in out:
+                continue
+            player = players[i]
+            for hid in broad["bonus_hearts"].scan(player):
+                j = hearts.slot[hid]
+                if collides(player, Rect(hearts.x[j], hearts.y[j], 1, 1)):
+                    if lives is None:
+                        if game_state["lives"] < 3:
+                            game_state["lives"] += 1
+                    elif lives[i] < 3:
+                        lives[i] += 1
+                    picked = hearts.to_dict(j)
+                    hearts.remove(hid)
+                    broad["bonus_hearts"].remove(hid)
+                    events.append(("heart_picked", tag(i, picked)))
+    if prof:
+        prof.mark("hearts")
+
+    # Goal collision.
+    goal = world["goal"]
+    if goal is not None:
+        for i in active:
+            if i not in out and collides(players[i], goal):
+                events.append(("complete", tag(i, goal.to_dict('width', 'height'))))
+                break
+    if prof:
+        prof.mark("goal")
+    return events
+
+def ends_level(events):
+    """The play_level result an event list calls for, or None."""
+    for name, _ in events:
+        if name in ("game_over", "complete"):
+            return name
+    return None
+
+SCRIPT_ACTIONS = {"L": "left", "R": "right", "J": "jump"}
+KEY_ACTIONS = {1: "left", 4: "right", 23: "jump"}  # Ctrl+A, Ctrl+D, Ctrl+W
+
+def parse_input_script(script):
+    """Turn "R*40 RJ R*10 .*5" into one list of actions per tick: each word
+    is a mix of L/R/J (or . for nothing), optionally repeated with *N."""
+    ticks = []
+    for word in script.split():
+        keys, _, count = word.partition("*")
+        actions = [SCRIPT_ACTIONS[k] for k in keys.upper() if k != "."]
+        ticks.extend([actions] * int(count or 1))
+    return ticks
+
+def simulate(level, game_state, sh, sw, script, max_ticks=None, rng=None):
+    """Run a level headless. script is a list of per-tick action lists (see
+    parse_input_script); once it runs out the player stands still until
+    max_ticks. Returns (result, ticks, events) where result is "complete",
+    "game_over" or None if time ran out."""
+    world = new_world(level, game_state, sh, sw, rng)
+    if max_ticks is None:
+        max_ticks = len(script)
+    all_events = []
+    for t in range(max_ticks):
+        events = step(world, script[t] if t < len(script) else ())
+        all_events.extend(events)
+        result = ends_level(events)
+        if result:
+            break
+    else:
+        result = None
+    sync_level(world)
+    return result, world["tick"], all_events
+
+# ─── LEVEL SOLVER ──────────────────────────────────────────
+# Searches the player's own physics (the same numbers step() uses) for a
+# way from the spawn to the goal. Enemies are left out: they can be stomped
+# or waited out, so they never make a level unbeatable; lava, planes and
+# falling off the bottom end a path.
+SOLVER_MOVES = (".", "R", "L", "J", "RJ", "LJ")
+SOLVER_MAX_STATES = 200000   # give up after looking at this many
+SOLVER_GAVE_UP = object()    # solve_level's answer when it ran out of states first
+
+def solve_level(level, sh, sw, speed=BASE_SPEED, max_states=SOLVER_MAX_STATES):
+    """An input script (parse_input_script format) that gets from the spawn
+    to the goal, None if there isn't one, or SOLVER_GAVE_UP if it looked at
+    max_states states without finding out. A* over (x, y, vy, jumping);
+    every value is a multiple of 0.5 so states repeat exactly."""
+    import heapq
+    width = level.get("width", sw)
+    p = level["player"]
+    pw, ph = p["width"], p["height"]
+    platforms = [(d["x"], d["y"], d["w"]) for d in level["platforms"]]
+    hazards = [(d["x"], d["y"], d["w"], d["h"]) for d in level["lava"] + level["planes"]]
+    goal = level.get("goal")
+    if not goal:
+        return None
+    gx, gy, gw, gh = goal["x"], goal["y"], goal["width"], goal["height"]
+
+    def moved(x, y, vy, jumping, move):
+        vx = 0
+        for key in move:
+            if key == "R":
+                vx = speed
+            elif key == "L":
+                vx = -speed
+            elif key == "J" and not jumping:
+                vy = JUMP_VELOCITY
+                jumping = True
+        vy += GRAVITY
+        x += vx
+        y += vy
+        for bx, by, bw in platforms:
+            if x + pw > bx and x < bx + bw and vy >= 0 and y + ph >= by and y + ph - vy <= by:
+                y = by - ph
+                vy = 0
+                jumping = False
+        if y > sh:
+            return None
+        for hx, hy, hw, hh in hazards:
+            if x < hx + hw and x + pw > hx and y < hy + hh and y + ph > hy:
+                return None
+        return x, y, vy, jumping
+
+    def ticks_left(x):
+        # at least this many ticks to cover the gap to the goal at full speed
+        if x + pw > gx and x < gx + gw:
+            return 0
+        return max(gx - (x + pw), x - (gx + gw), 0) / speed
+
+    start = (float(p["x"]), float(p["y"]), float(p.get("vy", 0)), bool(p.get("jumping")))
+    came_from = {start: None}
+    queue = [(ticks_left(start[0]), 0, start)]
+    while queue and len(came_from) < max_states:
+        _, ticks, state = heapq.heappop(queue)
+        for move in SOLVER_MOVES:
+            nxt = moved(*state, move)
+            if nxt is None or nxt in came_from or not -pw <= nxt[0] <= width:
+                continue
+            came_from[nxt] = (state, move)
+            x, y = nxt[0], nxt[1]
+            if x < gx + gw and x + pw > gx and y < gy + gh and y + ph > gy:
+                moves = []
+                while came_from[nxt] is not None:
+                    nxt, move = came_from[nxt]
+                    moves.append(move)
+                return compress_script(reversed(moves))
+            heapq.heappush(queue, (ticks + 1 + ticks_left(x), ticks + 1, nxt))
+    return SOLVER_GAVE_UP if queue else None
+
+def compress_script(moves):
+    """["R", "R", "RJ"] -> "R*2 RJ"."""
+    words = []
+    for move in moves:
+        if words and words[-1][0] == move:
+            words[-1][1] += 1
+        else:
+            words.append([move, 1])
+    return " ".join(m if n == 1 else f"{m}*{n}" for m, n in words)
+
+# ─── JUMP GRAPH AND BOT ────────────────────────────────────
+# Every jump follows the same arc, so it is worked out once: JUMP_ARC[t-1]
+# is (feet drop, vy) t ticks after leaving the ground, and LANDING_TICK[d]
+# is the tick a jump comes down through a platform top d rows below the
+# one it left (negative d = higher up). A LevelGraph turns a level into the
+# places a player can stand safely and the jumps between them, with the
+# next hop towards the goal worked out for every place up front.
+ARC_TICKS = 64
+
+def jump_arc(vy=JUMP_VELOCITY, ticks=ARC_TICKS):
+    arc = []
+    dy = 0.0
+    for _ in range(ticks):
+        vy += GRAVITY
+        dy += vy
+        arc.append((dy, vy))
+    return tuple(arc)
+
+JUMP_ARC = jump_arc()
+
+def landing_ticks(arc=JUMP_ARC):
+    table = {}
+    for t, (dy, vy) in enumerate(arc, 1):
+        if vy < 0:
+            continue
+        for d in range(math.ceil(dy - vy), math.floor(dy) + 1):
+            table.setdefault(d, t)
+    return table
+
+LANDING_TICK = landing_ticks()
+
+class LevelGraph:
+    """Standing spots and jumps of one level. Nodes are segments (top, x0,
+    x1): the player's x can be anything from x0 to x1 (in steps of speed,
+    lined up with the spawn) standing on the platform top without touching
+    lava or a plane. An edge is one jump with R, L or nothing held: (node,
+    ticks, launch_lo, launch_hi, move). Mid-air hazards and platforms in
+    the way are not checked; the Bot plays the moves out on the real
+    engine, which is."""
+    GOAL = -1
+
+    def __init__(self, level, sh, sw, speed=BASE_SPEED):
+        self.speed = speed
+        self.sh = sh
+        p = level["player"]
+        self.pw, self.ph = p["width"], p["height"]
+        self.origin = float(p["x"]) % speed
+        self.goal = level.get("goal")
+        hazards = [(d["x"], d["y"], d["w"], d["h"]) for d in level["lava"] + level["planes"]]
+        self.nodes = []
+        self.under = []     # (x, w) of the platform each node stands on
+        for plat in level["platforms"]:
+            segs = self._segments(plat, hazards)
+            self.nodes.extend(segs)
+            self.under.extend([(plat["x"], plat["w"])] * len(segs))
+        self.edges = [self._jumps(i) for i in range(len(self.nodes))]
+        self.next_hop, self.cost = self._route()
+
+    def _segments(self, plat, hazards):
+        pw, ph, s = self.pw, self.ph, self.speed
+        top = plat["y"]
+        y = top - ph
+        k = math.floor((plat["x"] - pw - self.origin) / s) + 1
+        segs = []
+        start = None
+        while True:
+            x = self.origin + k * s
+            if x >= plat["x"] + plat["w"]:
+                break
+            safe = not any(x < hx + hw and x + pw > hx and y < hy + hh and y + ph > hy
+                           for hx, hy, hw, hh in hazards)
+            if safe and start is None:
+                start = x
+            elif not safe and start is not None:
+                segs.append((top, start, x - s))
+                start = None
+            k += 1
+        if start is not None:
+            segs.append((top, start, x - s))
+        return segs
+
+    def _jumps(self, i):
+        top, ax0, ax1 = self.nodes[i]
+        ux, uw = self.under[i]
+        s, pw, ph = self.speed, self.pw, self.ph
+        t0 = LANDING_TICK[0]
+        best = {}
+        for j, (btop, bx0, bx1) in enumerate(self.nodes):
+            t = LANDING_TICK.get(btop - top)
+            if j == i or t is None:
+                continue
+            for move, dx in (("J", 0.0), ("RJ", t * s), ("LJ", -t * s)):
+                lo, hi = max(ax0, bx0 - dx), min(ax1, bx1 - dx)
+                if btop > top:
+                    # going down: be clear of our own platform by the time
+                    # the arc comes back through its top
+                    if move == "J":
+                        continue
+                    if move == "RJ":
+                        lo = max(lo, ux + uw - t0 * s)
+                    else:
+                        hi = min(hi, ux - pw + t0 * s)
+                    lo = self.origin + math.ceil((lo - self.origin) / s - 1e-9) * s
+                if lo <= hi and (j not in best or t < best[j][1]):
+                    best[j] = (j, t, lo, hi, move)
+        edges = list(best.values())
+        goal = self.goal
+        if goal:
+            gx, gy, gw, gh = goal["x"], goal["y"], goal["width"], goal["height"]
+            y = top - ph
+            if y < gy + gh and y + ph > gy and gx - pw < ax1 + 1e-9 and ax0 < gx + gw:
+                lo = max(ax0, ax0 + math.ceil((gx - pw - ax0) / s + 1e-9) * s)
+                edges.append((self.GOAL, 0, lo, ax1, "R"))  # walk in
+            else:
+                # only while above the platform jumped from; lower down the
+                # jump lands back on it unless it also left it, and the
+                # nodes below cover that
+                for t, (dy, vy) in enumerate(JUMP_ARC[:LANDING_TICK[0]], 1):
+                    if not (y + dy < gy + gh and y + dy + ph > gy):
+                        continue
+                    for move, dx in (("J", 0.0), ("RJ", t * s), ("LJ", -t * s)):
+                        lo = max(ax0, gx - pw - dx + 1e-9)
+                        hi = min(ax1, gx + gw - dx - 1e-9)
+                        k = math.ceil((lo - self.origin) / s - 1e-9)
+                        lo = self.origin + k * s
+                        if lo <= hi:
+                            edges.append((self.GOAL, t, lo, hi, move))
+                            break
+                    else:
+                        continue
+                    break
+        return edges
+
+    def _route(self):
+        """Dijkstra back from the goal: each node's best first edge and
+        the ticks in the air from there to the goal."""
+        import heapq
+        incoming = [[] for _ in self.nodes]
+        cost = {}
+        queue = []
+        for i, edges in enumerate(self.edges):
+            for edge in edges:
+                if edge[0] == self.GOAL:
+                    heapq.heappush(queue, (edge[1] + 1, i, edge))
+                else:
+                    incoming[edge[0]].append((i, edge))
+        next_hop = {}
+        while queue:
+            c, i, edge = heapq.heappop(queue)
+            if i in cost:
+                continue
+            cost[i] = c
+            next_hop[i] = edge
+            for j, e in incoming[i]:
+                if j not in cost:
+                    heapq.heappush(queue, (c + e[1] + 1, j, e))
+        return next_hop, cost
+
+    def drop(self, node, edge):
+        """Forget a jump that didn't go where it should and route around it."""
+        self.edges[node].remove(edge)
+        self.next_hop, self.cost = self._route()
+
+    def node_at(self, x, y):
+        """The node a player standing at (x, y) is on, or None."""
+        feet = y + self.ph
+        for i, (top, x0, x1) in enumerate(self.nodes):
+            if top == feet and x0 - 1e-9 <= x <= x1 + 1e-9:
+                return i
+        return None
+
+    def path(self, node):
+        """Edges from node to the goal, [] if there's no way."""
+        edges = []
+        while node in self.next_hop and len(edges) <= len(self.nodes):
+            edge = self.next_hop[node]
+            edges.append(edge)
+            if edge[0] == self.GOAL:
+                return edges
+            node = edge[0]
+        return []
+
+class Bot:
+    """Plays a level by following its LevelGraph: walk to the launch spot of
+    the next jump, jump, hold the direction until landing, look again. A
+    jump that lands somewhere else (something in the way) is dropped from
+    the graph so the bot doesn't try it again. Enemies are not looked at."""
+    def __init__(self, graph):
+        self.graph = graph
+        self.held = ""      # direction held while in the air
+        self.jump = None    # (node, edge) of the jump under way
+
+    def move(self, player):
+        """This tick's move as a script word ("R", "LJ", "." ...)."""
+        graph = self.graph
+        if player.jumping or player.vy != 0:
+            return self.held or "."
+        self.held = ""
+        node = graph.node_at(player.x, player.y)
+        if self.jump:
+            start, edge = self.jump
+            self.jump = None
+            if edge[0] != node and edge in graph.edges[start]:
+                graph.drop(start, edge)
+        edge = graph.next_hop.get(node)
+        if edge is None:
+            return "R"  # lost: keep going towards where goals usually are
+        _, ticks, lo, hi, move = edge
+        if player.x < lo - 1e-9:
+            return "R"
+        if player.x > hi + 1e-9:
+            return "L"
+        if edge[0] == graph.GOAL and ticks == 0:
+            return "R" if player.x + graph.pw <= graph.goal["x"] else "L"
+        self.held = move[:-1]
+        self.jump = (node, edge)
+        return move
+
+def run_bot(level, game_state, sh, sw, max_ticks=2000, rng=None):
+    """Let a Bot play the level on the engine. Returns (result, ticks,
+    script) like simulate, script being what the bot pressed."""
+    world = new_world(level, game_state, sh, sw, rng)
+    bot = Bot(LevelGraph(level, sh, sw, effective_speed(game_state)))
+    moves = []
+    result = None
+    while world["tick"] < max_ticks and result is None:
+        move = bot.move(world["player"])
+        moves.append(move)
+        result = ends_level(step(world, [SCRIPT_ACTIONS[k] for k in move if k != "."]))
+    return result, world["tick"], compress_script(moves)
+
+# ─── RECORD AND REPLAY ─────────────────────────────────────
+# A recording holds everything needed to play a level again tick for tick:
+# how the level was built, both RNG seeds (the level's enemy pick and the
+# world's heart drops), lives and speed going in, and every key with the
+# tick it landed on. It is saved as JSON.
+RECORDING_VERSION = 1
+
+class Recorder:
+    def __init__(self, level_num, sh, sw, width, game_state, level_seed, tick_rate=TICK_RATE):
+        self.data = {"version": RECORDING_VERSION, "generator": GENERATOR_VERSION,
+                     "level": level_num, "sh": sh, "sw": sw,
+                     "width": "inf" if width == math.inf else width,
+                     "lives": game_state["lives"], "speed_bonus": game_state.get("speed_bonus", 0),
+                     "level_seed": level_seed, "seed": None, "tick_rate": tick_rate,
+                     "keys": [], "result": None, "ticks": 0}
+
+    def key(self, tick, key):
+        self.data["keys"].append([tick, key])
+
+    def finish(self, result, ticks):
+        self.data["result"] = result
+        self.data["ticks"] = ticks
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+class Replay:
+    def __init__(self, data):
+        if data.get("version") != RECORDING_VERSION:
+            raise ValueError("recording was made by a different version of the game")
+        self.data = data
+        self.by_tick = {}
+        for tick, key in data["keys"]:
+            self.by_tick.setdefault(tick, []).append(key)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def build(self):
+        """A fresh (level, game_state) exactly as the recording started."""
+        d = self.data
+        width = math.inf if d["width"] == "inf" else d["width"]
+        level = load_level(d["level"], d["sh"], d["sw"], width, random.Random(d["level_seed"]))
+        return level, {"lives": d["lives"], "speed_bonus": d["speed_bonus"]}
+
+    def actions(self, tick):
+        return [KEY_ACTIONS[k] for k in self.by_tick.get(tick, ()) if k in KEY_ACTIONS]
+
+    def run_headless(self):
+        """Replay as fast as the engine goes. Returns (result, ticks, seconds);
+        result and ticks match the recording when everything is in sync."""
+        d = self.data
+        level, game_state = self.build()
+        world = new_world(level, game_state, d["sh"], d["sw"], random.Random(d["seed"]))
+        result = None
+        started = time.perf_counter()
+        while world["tick"] < d["ticks"]:
+            result = ends_level(step(world, self.actions(world["tick"] + 1)))
+            if result:
+                break
+        elapsed = time.perf_counter() - started
+        if result is None and d["result"] not in ("complete", "game_over"):
+            result = d["result"]  # the player left the level with a key (Ctrl+P/B)
+        return result, world["tick"], elapsed
@@ -0,0 +1,421 @@
+"""Playing a level on a screen, the level preview and the main game loop."""
+import curses, time, random, math, pprint, os
+from .levels import load_level
+from .engine import (FRAME_RATE, FrameProfiler, GameClock, MAX_CATCHUP_TICKS, Recorder, TICK_RATE,
+                     WAKE_MARGIN, camera_x, ends_level, lerp, new_world, step, view_x)
+from .save import SAVE_EVERY_TICKS, load_save, restore_world
+from .boss import boss_fight
+from .render import AnsiScreen, KEY_REPEAT, KeyInput, LOCAL_KEYS, PLAYER_GLYPHS, Renderer, draw_hud
+
+# ─── GAMEPLAY LOOP FOR A LEVEL ─────────────────────────────
+def enemy_rows(world, left, span):
+    """Rows of the enemies that can be within columns left..left+span;
+    in a wide level everyone else is off screen and gets skipped."""
+    enemies = world["enemies"]
+    grid = world["broad"]["enemies"]
+    if not grid.gridded:
+        return range(len(enemies))
+    return sorted(enemies.slot[eid] for eid in grid.query(left, 0, span, world["sh"]))
+
+def draw_world(renderer, world, at=None, follow=None):
+    """Draw the HUD, enemies, hearts and player for one frame and return the
+    camera column. at(key, x, y) says where something goes on screen;
+    play_level passes its interpolation, the default is where it is now.
+    follow is the player the camera keeps on screen (default: the middle
+    of everyone still playing)."""
+    if at is None:
+        at = lambda key, x, y: (int(x), int(y))
+    sh, sw = world["sh"], world["sw"]
+    enemies = world["enemies"]
+    hearts = world["bonus_hearts"]
+    shown = [(i, at(("player", i), p.x, p.y)) for i, p in enumerate(world["players"])
+             if i not in world["out"]]
+    if follow is not None:
+        p = world["players"][follow]
+        cam = camera_x(at(("player", follow), p.x, p.y)[0], sw, world["width"])
+    elif len(world["players"]) == 1:
+        cam = camera_x(shown[0][1][0], sw, world["width"])
+    else:
+        cam = camera_x(sum(pos[0] for _, pos in shown) // max(len(shown), 1), sw, world["width"])
+    renderer.scroll_to(cam)
+    draw_hud(renderer, world["state"], sh, sw)
+    for i in enemy_rows(world, cam, sw):
+        symbol = "E"
+        if enemies.type[i] == "slime":
+            symbol = "S"
+        elif enemies.type[i] == "flying":
+            symbol = "F"
+        ex, ey = at(("enemy", enemies.ids[i]), enemies.x[i], enemies.y[i])
+        renderer.addstr(ey, ex - cam, symbol)
+    for i, hid in enumerate(hearts.ids):
+        hx, hy = at(("heart", hid), hearts.x[i], hearts.y[i])
+        renderer.addch(hy, hx - cam, hearts.symbol[i])
+    for n, (px, py) in shown:
+        player = world["players"][n]
+        for i in range(player.h):
+            renderer.addstr(py + i, px - cam, PLAYER_GLYPHS[n] * player.w)
+    return cam
+
+def play_level(stdscr, level, level_num, game_state,
+               tick_rate=TICK_RATE, frame_rate=FRAME_RATE, recorder=None, replay=None,
+               profiler=None, key_repeat=KEY_REPEAT, players=1, saver=None, resume=None):
+    # recorder logs this run's keys; replay plays a recording back instead of
+    # reading movement keys (tick_rate above TICK_RATE fast-forwards it).
+    # profiler, if given, times every frame (for a trace file); otherwise one
+    # only exists while the Ctrl+T overlay shows it. key_repeat: see KeyInput.
+    # players > 1 shares the keyboard using LOCAL_KEYS. saver (a SaveGame)
+    # gets the level when it starts, then a checkpoint every
+    # SAVE_EVERY_TICKS ticks and whenever the game is paused; resume is a
+    # load_save() dict to carry on from instead of starting the level.
+    sh, sw = stdscr.getmaxyx()
+    stdscr.nodelay(True)
+    bindings = LOCAL_KEYS[:players]
+    keys = KeyInput(stdscr, key_repeat, held_keys={k for b in bindings for k in b})
+    paused = False  # pause state flag
+    clock = GameClock(tick_rate, frame_rate,
+                      max(MAX_CATCHUP_TICKS, int(MAX_CATCHUP_TICKS * tick_rate / TICK_RATE)),
+                      timer=stdscr.now, sleep=stdscr.sleep)
+    seed = replay.data["seed"] if replay else random.randrange(2 ** 32)
+    if resume:
+        world = restore_world(resume, game_state)
+    else:
+        world = new_world(level, game_state, sh, sw, random.Random(seed), players)
+    if recorder:
+        recorder.data["seed"] = seed
+    if saver:
+        saver.start_level(world, level_num)
+
+    def done(result):
+        if recorder:
+            recorder.finish(result, world["tick"])
+        return result
+
+    enemies = world["enemies"]
+    hearts = world["bonus_hearts"]
+    pending = [[] for _ in bindings]   # each player's actions waiting for the next tick
+    prev_pos = {}   # ("enemy", id) etc. -> (x, y) before the latest tick, for interpolation
+
+    def snapshot():
+        prev_pos.clear()
+        for i, player in enumerate(world["players"]):
+            prev_pos[("player", i)] = (player.x, player.y)
+        left = camera_x(view_x(world), sw, world["width"]) - WAKE_MARGIN
+        for i in enemy_rows(world, left, sw + 2 * WAKE_MARGIN):
+            prev_pos[("enemy", enemies.ids[i])] = (enemies.x[i], enemies.y[i])
+        for i, hid in enumerate(hearts.ids):
+            prev_pos[("heart", hid)] = (hearts.x[i], hearts.y[i])
+
+    def at(key, x, y):
+        """Where to draw something this frame: between its last two ticks."""
+        old = prev_pos.get(key)
+        if old is None:
+            return int(x), int(y)
+        alpha = clock.alpha
+        return int(lerp(old[0], x, alpha)), int(lerp(old[1], y, alpha))
+
+    renderer = Renderer(stdscr)
+    renderer.set_static(level)
+    for live in world.get("stream", {}).get("live", {}).values():
+        renderer.paint_static(live["chunk"])
+    overlay = None  # Ctrl+T cycles None -> "bytes" -> "profile"
+    prof = world["profile"] = profiler
+    while True:
+        if prof:
+            prof.begin()
+        dropped = clock.dropped
+        # Process keys
+        for key in keys.poll():
+            if recorder:
+                recorder.key(world["tick"] + 1, key)
+            binding = next((b for b in bindings if key in b), None)
+            if binding is not None:
+                if not replay:
+                    pending[bindings.index(binding)].append(binding[key])
+            elif key == 16:  # Ctrl+P: reload current level
+                return done("reload")
+            elif key == 2:   # Ctrl+B: reset game
+                return done("reset")
+            elif key == 19:  # Ctrl+S: pause
+                paused = True
+                if saver:
+                    saver.checkpoint(world)
+            elif key == 26:  # Ctrl+Z: resume (continue)
+                if paused:
+                    renderer.invalidate()  # wipe the pause banner
+                paused = False
+                clock.reset()
+            elif key == 20:  # Ctrl+T: bytes-per-frame readout, then frame profiler, then off
+                overlay = {None: "bytes", "bytes": "profile"}.get(overlay)
+                renderer.invalidate()
+                if overlay == "profile" and prof is None:
+                    prof = world["profile"] = FrameProfiler()
+                    prof.begin()
+                elif overlay is None and profiler is None:
+                    prof = world["profile"] = None
+        if prof:
+            prof.mark("input")
+
+        # If paused, display pause message and sleep until a key comes in.
+        if paused:
+            stdscr.addstr(sh//2, sw//2 - len("[PAUSED]   Ctrl+Z to continue")//2, "[PAUSED]   Ctrl+Z to continue")
+            stdscr.refresh()
+            keys.wait()
+            continue
+
+        result = None
+        for _ in range(clock.ticks()):
+            if replay:
+                if world["tick"] >= replay.data["ticks"]:
+                    result = replay.data["result"]
+                    break
+                pending = [replay.actions(world["tick"] + 1)]
+            snapshot()
+            events = step(world, pending[0] if players == 1 else pending)
+            pending = [[] for _ in bindings]
+            if saver and world["tick"] % SAVE_EVERY_TICKS == 0:
+                saver.checkpoint(world)
+            for name, detail in events:
+                if name == "life_lost":
+                    # no smear across the screen
+                    prev_pos.pop(("player", detail[0] if players > 1 else 0), None)
+                elif name == "chunk_loaded":
+                    renderer.paint_static(detail)
+                elif name == "chunk_unloaded":
+                    renderer.clear_static(detail["x0"], detail["x1"])
+            result = ends_level(events)
+            if result is not None:
+                break
+        if result in ("game_over", "reload", "reset"):
+            return done(result)
+        if result == "complete":
+            stdscr.nodelay(False)
+            stdscr.clear()
+            try:
+                stdscr.addstr(sh // 2, sw // 2 - 20, "You delivered the drinks! Press any key...")
+            except curses.error:
+                pass
+            stdscr.refresh()
+            stdscr.getch()
+            stdscr.nodelay(True)
+            return done("complete")
+
+        # ─── DRAWING ─────────────────────────────
+        draw_world(renderer, world, at)
+        if overlay == "bytes":
+            if isinstance(stdscr, AnsiScreen):
+                # what actually went to the terminal, not the renderer's estimate
+                last, avg = stdscr.last_written, stdscr.bytes_written // max(stdscr.frames, 1)
+            else:
+                last, avg = renderer.last_bytes, renderer.total_bytes // max(renderer.frames, 1)
+            renderer.addstr(1, 40, f"{renderer.last_cells} cells  {last} B/frame  avg {avg} B")
+        elif overlay == "profile":
+            summary, phases = prof.overlay()
+            renderer.addstr(0, 16, summary[:max(sw - 28, 0)])
+            renderer.addstr(2, 0, phases[:sw - 1])
+        if prof:
+            renderer.present(refresh=False)
+            prof.mark("draw")
+            stdscr.refresh()
+            prof.mark("refresh")
+            prof.end(clock.dropped - dropped)
+        else:
+            renderer.present()
+        clock.wait()
+
+# ─── SHOW LEVEL CODE (PRE-LEVEL PREVIEW) ─────────────
+# LevelInspector never formats the whole level: it knows how many rows
+# each key takes (one, or a header plus one per entry for the entity
+# lists) and pformats an entry only when its row is on screen, so opening
+# a level with 10 entities or 100000 costs the same.
+class LevelInspector:
+    def __init__(self, level, level_num=None):
+        self.level = level
+        self.level_num = level_num
+        self.keys = sorted(level)         # pformat's order
+        self.folded = set()               # list keys shown as just their header
+        self.top = 0                      # first row on screen
+        self.cursor = 0
+
+    def is_list(self, key):
+        return isinstance(self.level[key], list) and self.level[key]
+
+    def rows(self, key):
+        if self.is_list(key) and key not in self.folded:
+            return 1 + len(self.level[key])
+        return 1
+
+    def __len__(self):
+        return 1 + sum(self.rows(key) for key in self.keys)
+
+    def find(self, row):
+        """(key, index) for a row: index None is the key's own line, the
+        summary row is (None, None)."""
+        if row == 0:
+            return None, None
+        row -= 1
+        for key in self.keys:
+            n = self.rows(key)
+            if row < n:
+                return key, (row - 1 if row else None)
+            row -= n
+        return None, None
+
+    def summary(self):
+        level = self.level
+        head = f"level {self.level_num}  " if self.level_num is not None else ""
+        width = level.get("width")
+        if width is not None:
+            head += f"width {'endless' if width == math.inf else width}  "
+        counts = "  ".join(f"{key} {len(level[key])}" for key in self.keys
+                           if isinstance(level[key], list))
+        return head + counts
+
+    def line(self, row):
+        key, index = self.find(row)
+        if key is None:
+            return self.summary()
+        value = self.level[key]
+        if index is not None:
+            return f"    {index:>5}  {pprint.pformat(value[index], width=10 ** 9)}"
+        if self.is_list(key):
+            mark = "+" if key in self.folded else "-"
+            return f"{mark} {key} ({len(value)})"
+        return f"  {key}: {pprint.pformat(value, width=10 ** 9)}"
+
+    def toggle(self):
+        """Fold or unfold the list the cursor is in; the cursor goes to its header."""
+        key, index = self.find(self.cursor)
+        if key is None or not self.is_list(key):
+            return
+        self.cursor -= 0 if index is None else index + 1
+        self.folded ^= {key}
+
+    def fold_all(self, fold):
+        self.folded = {key for key in self.keys if self.is_list(key)} if fold else set()
+        self.cursor = min(self.cursor, len(self) - 1)
+
+    def move(self, rows, page):
+        self.cursor = max(0, min(len(self) - 1, self.cursor + rows))
+        if self.cursor < self.top:
+            self.top = self.cursor
+        elif self.cursor >= self.top + page:
+            self.top = self.cursor - page + 1
+
+    def draw(self, stdscr, sh, sw):
+        page = sh - 1
+        self.move(0, page)
+        total = len(self)
+        stdscr.erase()
+        for i in range(min(page, total - self.top)):
+            row = self.top + i
+            text = (">" if row == self.cursor else " ") + self.line(row)
+            try:
+                stdscr.addstr(i, 0, text[:sw - 1])
+            except curses.error:
+                pass
+        msg = (f"Ctrl+R: Run | Ctrl+B: Reset | arrows/PgUp/PgDn move, Enter fold, c/e all"
+               f"  {self.cursor + 1}/{total}")
+        try:
+            stdscr.addstr(sh - 1, 0, msg[:sw - 1])
+        except curses.error:
+            pass
+        stdscr.refresh()
+
+def show_level_code(stdscr, level, level_num=None):
+    sh, sw = stdscr.getmaxyx()
+    inspector = LevelInspector(level, level_num)
+    page = sh - 1
+    stdscr.nodelay(False)  # getch sleeps until a key comes in
+    while True:
+        inspector.draw(stdscr, sh, sw)
+        key = stdscr.getch()
+        if key == 18:      # Ctrl+R
+            return "run"
+        elif key == 2:     # Ctrl+B
+            return "reset"
+        elif key == curses.KEY_UP:
+            inspector.move(-1, page)
+        elif key == curses.KEY_DOWN:
+            inspector.move(1, page)
+        elif key == curses.KEY_PPAGE:
+            inspector.move(-page, page)
+        elif key == curses.KEY_NPAGE:
+            inspector.move(page, page)
+        elif key in (10, 13, ord(" ")):
+            inspector.toggle()
+        elif key in (ord("c"), ord("e")):
+            inspector.fold_all(key == ord("c"))
+
+# ─── MAIN GAME LOOP ─────────────────────────────────────────────
+def main(stdscr, screens=1, endless=False, record_dir=None, profiler=None, key_repeat=KEY_REPEAT,
+         players=1, saver=None):
+    # saver (a SaveGame) keeps the game in a file; a save left there for
+    # this screen size and player count is carried on from first.
+    sh, sw = stdscr.getmaxyx()
+    width = math.inf if endless else (sw * screens if screens > 1 else None)
+    current_level = 1
+    game_state = {"lives": 3, "speed_bonus": 0}
+
+    def new_game():
+        game_state["lives"] = 3
+        if players > 1:
+            game_state["player_lives"] = [3] * players
+    new_game()
+    takes = 0  # recordings saved this session
+    resume = load_save(saver.path) if saver else None
+    if resume and ((resume["sh"], resume["sw"]) != (sh, sw) or resume["players"] != players):
+        resume = None
+    if resume:
+        current_level = resume["level_num"]
+    while True:
+        if resume:
+            level = resume["level"]
+        else:
+            level_seed = random.randrange(2 ** 32)
+            level = load_level(current_level, sh, sw, width, random.Random(level_seed))
+            if saver:
+                # the save moves on to this level straight away, so quitting
+                # before it starts (or after a reload) never puts the player
+                # back in the middle of the level they just left
+                saver.start_level(new_world(level, game_state, sh, sw, random.Random(level_seed), players),
+                                  current_level)
+            # Boss fight on every 10th level.
+            if current_level % 10 == 0:
+                bonus = boss_fight(stdscr)
+                game_state["speed_bonus"] = bonus
+            else:
+                game_state["speed_bonus"] = 0
+            action = show_level_code(stdscr, level, current_level)
+            if action == "reset":
+                current_level = 1
+                new_game()
+                continue
+        recorder = None
+        if record_dir and players == 1 and not resume:   # recordings replay one player's keys
+            recorder = Recorder(current_level, sh, sw, width, game_state, level_seed)
+        result = play_level(stdscr, level, current_level, game_state,
+                            recorder=recorder, profiler=profiler, key_repeat=key_repeat,
+                            players=players, saver=saver, resume=resume)
+        resume = None
+        if recorder:
+            takes += 1
+            recorder.save(os.path.join(record_dir, f"level{current_level}-{int(time.time())}-{takes}.json"))
+        if result == "reload":
+            continue
+        elif result == "reset":
+            current_level = 1
+            new_game()
+            if saver:
+                saver.discard()
+        elif result == "game_over":
+            if saver:
+                saver.discard()
+            stdscr.nodelay(False)
+            stdscr.clear()
+            stdscr.addstr(sh // 2, sw // 2 - 10, "Game Over! Press any key...")
+            stdscr.refresh()
+            stdscr.getch()
+            current_level = 1
+            new_game()
+        elif result == "complete":
+            current_level += 1
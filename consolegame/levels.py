@@ -0,0 +1,470 @@
+"""Levels: the handcrafted ones (1-10), generated and streamed ones (11+),
+and the binary level format, packs and cache. Uses nothing else from the
+package, so building levels never loads the engine, curses or a terminal."""
+import random, math, os, threading, struct
+from collections import OrderedDict
+
+# ─── HANDCRAFTED LEVELS (Levels 1–10) ─────────────────────
+def load_handcrafted_level(level_num, sh, sw, rng=random):
+    if level_num == 1:
+        platforms = [
+            {'x': 0, 'y': sh - 2, 'w': sw, 'h': 1},
+            {'x': 10, 'y': sh - 6, 'w': 15, 'h': 1}
+        ]
+        enemies = [
+            {'x': 12.0, 'y': sh - 7.0, 'vx': 0.5, 'width': 3, 'height': 1,
+             'min_x': 10, 'max_x': 25, 'type': 'basic'}
+        ]
+        goal = {'x': sw - 10, 'y': sh - 4, 'width': 5, 'height': 2}
+        planes = []
+        lava = []
+    elif level_num == 2:
+        platforms = [
+            {'x': 0, 'y': sh - 2, 'w': sw, 'h': 1},
+            {'x': 20, 'y': sh - 5, 'w': 20, 'h': 1},
+            {'x': 45, 'y': sh - 8, 'w': 15, 'h': 1},
+        ]
+        enemies = [
+            {'x': 22.0, 'y': sh - 6.0, 'vx': 0.7, 'width': 3, 'height': 1,
+             'min_x': 20, 'max_x': 40, 'type': 'basic'}
+        ]
+        goal = {'x': sw - 15, 'y': sh - 4, 'width': 5, 'height': 2}
+        planes = []
+        lava = []
+    elif level_num == 3:
+        platforms = [
+            {'x': 0, 'y': sh - 2, 'w': sw, 'h': 1},
+            {'x': 15, 'y': sh - 6, 'w': 20, 'h': 1},
+            {'x': 40, 'y': sh - 9, 'w': 15, 'h': 1},
+        ]
+        enemies = [
+            {'x': 18.0, 'y': sh - 7.0, 'vx': 0.5, 'width': 3, 'height': 1,
+             'min_x': 15, 'max_x': 35, 'type': 'slime'}
+        ]
+        goal = {'x': sw - 10, 'y': sh - 4, 'width': 5, 'height': 2}
+        planes = []
+        lava = [{'x': sw//2 - 10, 'y': sh - 2, 'w': 20, 'h': 1}]
+    elif level_num == 4:
+        platforms = [
+            {'x': 0, 'y': sh - 2, 'w': sw, 'h': 1},
+            {'x': 10, 'y': sh - 7, 'w': 15, 'h': 1},
+            {'x': 35, 'y': sh - 10, 'w': 20, 'h': 1},
+            {'x': 60, 'y': sh - 8, 'w': 15, 'h': 1},
+        ]
+        enemies = [
+            {'x': 12.0, 'y': sh - 7.0, 'vx': 0.5, 'width': 3, 'height': 1,
+             'min_x': 10, 'max_x': 25, 'type': 'basic'},
+            {'x': 38.0, 'y': sh - 11.0, 'vx': 0.6, 'width': 3, 'height': 1,
+             'min_x': 35, 'max_x': 55, 'type': 'flying'}
+        ]
+        goal = {'x': sw - 12, 'y': sh - 4, 'width': 6, 'height': 2}
+        planes = [{'x': sw//3, 'y': sh - 12, 'w': 10, 'h': 1}]
+        lava = [{'x': sw//2 - 5, 'y': sh - 2, 'w': 10, 'h': 1}]
+    else:
+        platforms = [
+            {'x': 0, 'y': sh - 2, 'w': sw, 'h': 1},
+            {'x': 10 + level_num * 2, 'y': sh - (6 + level_num), 'w': 15, 'h': 1},
+            {'x': 30 + level_num * 3, 'y': sh - (8 + level_num * 2), 'w': 20, 'h': 1},
+            {'x': sw//2, 'y': sh - (10 + level_num), 'w': 10, 'h': 1}
+        ]
+        enemy_type = rng.choice(['basic', 'slime', 'flying'])
+        enemies = [
+            {'x': 12.0 + level_num, 'y': sh - (7.0 + level_num), 'vx': 0.5,
+             'width': 3, 'height': 1,
+             'min_x': 10 + level_num, 'max_x': 25 + level_num,
+             'type': enemy_type}
+        ]
+        goal = {'x': sw - (10 + level_num), 'y': sh - 4, 'width': 5, 'height': 2}
+        planes = [{'x': sw//3, 'y': sh - (12 + level_num), 'w': 10, 'h': 1}]
+        lava = []
+    player = {'x': 5.0, 'y': sh - 5, 'vx': 0.0, 'vy': 0.0,
+              'width': 3, 'height': 2, 'jumping': False}
+    bonus_hearts = []  # list for bonus heart pickups
+    level_dict = {
+        "platforms": platforms,
+        "enemies": enemies,
+        "goal": goal,
+        "player": player,
+        "planes": planes,
+        "lava": lava,
+        "bonus_hearts": bonus_hearts
+    }
+    return level_dict
+
+# ─── PROCEDURALLY GENERATED LEVELS (Level 11+) ───────────
+def generate_level(level_num, sh, sw, width=None):
+    # width makes a level that scrolls; each extra screen's worth of columns
+    # gets its own share of platforms, enemies and hazards.
+    width = width or sw
+    screens = max(1, width // sw)
+    rng = random.Random(int(level_num * math.pi * 1000))
+    platforms = []
+    platforms.append({'x': 0, 'y': sh - 2, 'w': width, 'h': 1})
+    num_platforms = rng.randint(2, 5) * screens
+    for i in range(num_platforms):
+        x = rng.randint(5, width - 20)
+        y = rng.randint(5, sh - 5)
+        w_plat = rng.randint(10, 20)
+        platforms.append({'x': x, 'y': y, 'w': w_plat, 'h': 1})
+    enemies = []
+    num_enemies = rng.randint(1, 3) * screens
+    for i in range(num_enemies):
+        x = rng.randint(10, width - 10)
+        enemy_type = rng.choice(['basic', 'slime', 'flying'])
+        enemy = {'x': float(x), 'y': float(sh - 3),
+                 'vx': rng.choice([0.5, -0.5]),
+                 'width': 3, 'height': 1,
+                 'min_x': max(0, x - 5), 'max_x': min(width - 3, x + 5),
+                 'type': enemy_type}
+        enemies.append(enemy)
+    goal = {'x': width - 10, 'y': sh - 4, 'width': 5, 'height': 2}
+    player = {'x': 5.0, 'y': sh - 5, 'vx': 0.0, 'vy': 0.0,
+              'width': 3, 'height': 2, 'jumping': False}
+    lava = []
+    for i in range(screens):
+        if rng.random() < 0.5:
+            x_lava = rng.randint(10, width - 20)
+            y_lava = rng.randint(sh - 10, sh - 2)
+            w_lava = rng.randint(5, 15)
+            lava.append({'x': x_lava, 'y': y_lava, 'w': w_lava, 'h': 1})
+    planes = []
+    for i in range(screens):
+        if rng.random() < 0.4:
+            x_plane = rng.randint(5, width - 15)
+            y_plane = rng.randint(3, sh - 15)
+            planes.append({'x': x_plane, 'y': y_plane, 'w': rng.randint(8, 15), 'h': 1})
+    bonus_hearts = []
+    level_dict = {
+        "platforms": platforms,
+        "enemies": enemies,
+        "goal": goal,
+        "player": player,
+        "planes": planes,
+        "lava": lava,
+        "bonus_hearts": bonus_hearts
+    }
+    if width != sw:
+        level_dict["width"] = width
+    return level_dict
+
+# ─── STREAMED LEVELS (chunked generation) ─────────────────
+# Very long or endless levels are cut into CHUNK_WIDTH-column chunks. Each
+# chunk is seeded from (level, chunk index) alone, so it comes out the same
+# whenever and in whatever order it is built, and only the chunks around
+# the camera are ever in the world.
+CHUNK_WIDTH = 64
+CHUNKS_AHEAD = 2          # chunks kept loaded past the right edge of the view
+CHUNKS_BEHIND = 1         # ...and before the left edge
+CHUNK_CACHE_SIZE = 32     # generated chunks remembered for reloads
+STREAM_MIN_SCREENS = 4    # levels at least this many screens wide are streamed
+
+def generate_chunk(level_num, index, sh, chunk_width=CHUNK_WIDTH):
+    rng = random.Random(int(level_num * math.pi * 1000) * 100003 + index)
+    x0 = index * chunk_width
+    platforms = [{'x': x0, 'y': sh - 2, 'w': chunk_width, 'h': 1}]
+    for i in range(rng.randint(1, 3)):
+        platforms.append({'x': x0 + rng.randint(0, chunk_width - 15), 'y': rng.randint(5, sh - 5),
+                          'w': rng.randint(10, 20), 'h': 1})
+    enemies = []
+    lava = []
+    planes = []
+    if index > 0:  # keep the spawn point clear
+        for i in range(rng.randint(0, 2)):
+            x = x0 + rng.randint(5, chunk_width - 8)
+            enemies.append({'x': float(x), 'y': float(sh - 3),
+                            'vx': rng.choice([0.5, -0.5]),
+                            'width': 3, 'height': 1,
+                            'min_x': max(x0, x - 5), 'max_x': min(x0 + chunk_width, x + 5),
+                            'type': rng.choice(['basic', 'slime', 'flying'])})
+        if rng.random() < 0.4:
+            lava.append({'x': x0 + rng.randint(0, chunk_width - 15), 'y': rng.randint(sh - 10, sh - 2),
+                         'w': rng.randint(5, 15), 'h': 1})
+        if rng.random() < 0.3:
+            planes.append({'x': x0 + rng.randint(0, chunk_width - 15), 'y': rng.randint(3, max(3, sh - 15)),
+                           'w': rng.randint(8, 15), 'h': 1})
+    return {"index": index, "x0": x0, "x1": x0 + chunk_width,
+            "platforms": platforms, "enemies": enemies, "planes": planes, "lava": lava}
+
+class ChunkCache:
+    """Bounded LRU of generated chunks keyed by (level, index, screen
+    height). prefetch() builds upcoming chunks on a background thread so the
+    frame that needs them only has to pick them up."""
+    def __init__(self, capacity=CHUNK_CACHE_SIZE, background=True):
+        self.capacity = capacity
+        self.background = background
+        self.chunks = OrderedDict()
+        self.pending = {}       # key -> Future still being built
+        self.lock = threading.Lock()
+        self.pool = None        # started on first prefetch
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, key, chunk):
+        with self.lock:
+            self.chunks[key] = chunk
+            self.chunks.move_to_end(key)
+            while len(self.chunks) > self.capacity:
+                self.chunks.popitem(last=False)
+
+    def get(self, level_num, index, sh):
+        key = (level_num, index, sh)
+        with self.lock:
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                self.chunks.move_to_end(key)
+                self.hits += 1
+                return chunk
+            future = self.pending.pop(key, None)
+        self.misses += 1
+        chunk = future.result() if future is not None else generate_chunk(level_num, index, sh)
+        self._store(key, chunk)
+        return chunk
+
+    def prefetch(self, level_num, indexes, sh):
+        if not self.background:
+            return
+        if self.pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunks")
+        for index in indexes:
+            key = (level_num, index, sh)
+            with self.lock:
+                if key in self.chunks or key in self.pending:
+                    continue
+                self.pending[key] = self.pool.submit(generate_chunk, level_num, index, sh)
+
+CHUNK_CACHE = ChunkCache()
+
+def stream_level(level_num, sh, sw, width=math.inf):
+    """A level whose geometry is generated chunk by chunk while it is played.
+    width=math.inf makes it endless (and goal-less); otherwise the goal sits
+    at the far end. Loading one costs the same however long it is."""
+    chunks = None if width == math.inf else max(1, int(width) // CHUNK_WIDTH)
+    goal = None
+    if chunks is not None:
+        width = chunks * CHUNK_WIDTH
+        goal = {'x': width - 10, 'y': sh - 4, 'width': 5, 'height': 2}
+    return {
+        "platforms": [],
+        "enemies": [],
+        "goal": goal,
+        "player": {'x': 5.0, 'y': sh - 5, 'vx': 0.0, 'vy': 0.0,
+                   'width': 3, 'height': 2, 'jumping': False},
+        "planes": [],
+        "lava": [],
+        "bonus_hearts": [],
+        "width": width,
+        "stream": {"level": level_num, "chunks": chunks}
+    }
+
+# ─── COMPILED LEVELS (binary format + cache) ──────────────
+# A level dict packs down to a few hundred bytes of fixed-size records:
+#   header   magic, generator version, level, screen size, width
+#   counts   platforms, planes, lava, enemies, hearts
+#   goal, player, then one record per platform/plane/lava/enemy/heart
+# Levels are kept packed in memory (and optionally on disk) and every load
+# unpacks a fresh copy, so reloading never reruns the generator.
+GENERATOR_VERSION = 2     # bump whenever a level comes out different
+LEVEL_MAGIC = b"CGLV"
+PACK_MAGIC = b"CGPK"
+LEVEL_HEADER = struct.Struct("<4sHiHHI")     # magic, version, level, sh, sw, width (0 = one screen)
+LEVEL_COUNTS = struct.Struct("<HHHHH")
+RECT_RECORD = struct.Struct("<iiii")         # x, y, w, h
+PLAYER_RECORD = struct.Struct("<diddHH?")    # x, y (a row), vx, vy, width, height, jumping
+ENEMY_RECORD = struct.Struct("<dddHHiiB")    # x, y, vx, width, height, min_x, max_x, type
+HEART_RECORD = struct.Struct("<ddd4s")       # x, y, vx, symbol (utf-8)
+PACK_HEADER = struct.Struct("<4sHI")         # magic, version, level count
+PACK_ENTRY = struct.Struct("<iHHIQI")        # level, sh, sw, width, offset, length
+ENEMY_TYPES = ['basic', 'slime', 'flying']
+LEVEL_CACHE_SIZE = 256
+
+def pack_level(level, level_num, sh, sw):
+    width = level.get("width", 0)
+    parts = [LEVEL_HEADER.pack(LEVEL_MAGIC, GENERATOR_VERSION, level_num, sh, sw, width),
+             LEVEL_COUNTS.pack(len(level["platforms"]), len(level["planes"]), len(level["lava"]),
+                               len(level["enemies"]), len(level["bonus_hearts"]))]
+    goal = level["goal"]
+    parts.append(RECT_RECORD.pack(goal['x'], goal['y'], goal['width'], goal['height']))
+    p = level["player"]
+    parts.append(PLAYER_RECORD.pack(p['x'], p['y'], p['vx'], p['vy'], p['width'], p['height'], p['jumping']))
+    for kind in ("platforms", "planes", "lava"):
+        for r in level[kind]:
+            parts.append(RECT_RECORD.pack(r['x'], r['y'], r['w'], r['h']))
+    for e in level["enemies"]:
+        parts.append(ENEMY_RECORD.pack(e['x'], e['y'], e['vx'], e['width'], e['height'],
+                                       e['min_x'], e['max_x'], ENEMY_TYPES.index(e['type'])))
+    for h in level["bonus_hearts"]:
+        parts.append(HEART_RECORD.pack(h['x'], h['y'], h['vx'], h['symbol'].encode("utf-8")))
+    return b"".join(parts)
+
+def unpack_level(buf, offset=0):
+    """Level dict from a packed level at buf[offset:]; buf may be bytes or an
+    mmap. Returns (level, level_num, sh, sw)."""
+    magic, version, level_num, sh, sw, width = LEVEL_HEADER.unpack_from(buf, offset)
+    if magic != LEVEL_MAGIC or version != GENERATOR_VERSION:
+        raise ValueError("not a packed level (or one from another version)")
+    offset += LEVEL_HEADER.size
+    counts = LEVEL_COUNTS.unpack_from(buf, offset)
+    offset += LEVEL_COUNTS.size
+    x, y, w, h = RECT_RECORD.unpack_from(buf, offset)
+    offset += RECT_RECORD.size
+    goal = {'x': x, 'y': y, 'width': w, 'height': h}
+    px, py, pvx, pvy, pw, ph, jumping = PLAYER_RECORD.unpack_from(buf, offset)
+    offset += PLAYER_RECORD.size
+    player = {'x': px, 'y': py, 'vx': pvx, 'vy': pvy, 'width': pw, 'height': ph, 'jumping': jumping}
+    level = {"goal": goal, "player": player}
+    for kind, count in zip(("platforms", "planes", "lava"), counts):
+        level[kind] = [{'x': x, 'y': y, 'w': w, 'h': h}
+                       for x, y, w, h in RECT_RECORD.iter_unpack(buf[offset:offset + count * RECT_RECORD.size])]
+        offset += count * RECT_RECORD.size
+    level["enemies"] = [{'x': ex, 'y': ey, 'vx': evx, 'width': ew, 'height': eh,
+                         'min_x': lo, 'max_x': hi, 'type': ENEMY_TYPES[t]}
+                        for ex, ey, evx, ew, eh, lo, hi, t in
+                        ENEMY_RECORD.iter_unpack(buf[offset:offset + counts[3] * ENEMY_RECORD.size])]
+    offset += counts[3] * ENEMY_RECORD.size
+    level["bonus_hearts"] = [{"x": hx, "y": hy, "vx": hvx, "symbol": sym.rstrip(b"\0").decode("utf-8")}
+                             for hx, hy, hvx, sym in
+                             HEART_RECORD.iter_unpack(buf[offset:offset + counts[4] * HEART_RECORD.size])]
+    if width:
+        level["width"] = width
+    return level, level_num, sh, sw
+
+def write_level_pack(path, levels):
+    """Write (level_num, sh, sw, level) tuples into one pack file that
+    LevelPack can open without reading the levels themselves. Levels that
+    load_level never reads from a pack are left out; returns their numbers."""
+    blobs, skipped = [], []
+    for num, sh, sw, level in levels:
+        if from_pack(num, sw, level.get("width")):
+            blobs.append((num, sh, sw, level.get("width", 0), pack_level(level, num, sh, sw)))
+        else:
+            skipped.append(num)
+    offset = PACK_HEADER.size + PACK_ENTRY.size * len(blobs)
+    index = []
+    for num, sh, sw, width, blob in blobs:
+        index.append(PACK_ENTRY.pack(num, sh, sw, width, offset, len(blob)))
+        offset += len(blob)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, GENERATOR_VERSION, len(blobs)))
+        f.write(b"".join(index))
+        for blob in blobs:
+            f.write(blob[4])
+    os.replace(tmp, path)
+    return skipped
+
+class LevelPack:
+    """A pack file opened with mmap: only the index is read up front, each
+    level is unpacked straight out of the mapping when asked for."""
+    def __init__(self, path):
+        import mmap
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = None
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.version, count = PACK_HEADER.unpack_from(self.map, 0)
+            if magic != PACK_MAGIC:
+                raise ValueError(f"{path} is not a level pack")
+            self.index = {}
+            for i in range(count):
+                num, sh, sw, width, offset, length = PACK_ENTRY.unpack_from(
+                    self.map, PACK_HEADER.size + i * PACK_ENTRY.size)
+                self.index[(num, sh, sw, width)] = (offset, length)
+        except BaseException:
+            self.close()
+            raise
+
+    def __len__(self):
+        return len(self.index)
+
+    def blob(self, level_num, sh, sw, width=0):
+        entry = self.index.get((level_num, sh, sw, width))
+        if entry is None or self.version != GENERATOR_VERSION:
+            return None
+        offset, length = entry
+        return self.map[offset:offset + length]
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+def build_level(level_num, sh, sw, width=None, rng=random):
+    if level_num <= 10:
+        return load_handcrafted_level(level_num, sh, sw, rng)
+    return generate_level(level_num, sh, sw, width)
+
+class LevelCache:
+    """Packed levels by (level, sh, sw, width), newest at the end. Misses
+    try the opened packs, then the disk cache directory (if any), then the
+    generator."""
+    def __init__(self, directory=None, capacity=LEVEL_CACHE_SIZE):
+        self.directory = directory
+        self.capacity = capacity
+        self.blobs = OrderedDict()
+        self.packs = []
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        level_num, sh, sw, width = key
+        return os.path.join(self.directory,
+                            f"level{level_num}_{sh}x{sw}_w{width}_v{GENERATOR_VERSION}.cglv")
+
+    def _find(self, key):
+        for pack in self.packs:
+            blob = pack.blob(*key)
+            if blob is not None:
+                return blob
+        if self.directory:
+            try:
+                with open(self._path(key), "rb") as f:
+                    return f.read()
+            except OSError:
+                pass
+        level_num, sh, sw, width = key
+        blob = pack_level(build_level(level_num, sh, sw, width or None), level_num, sh, sw)
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp = self._path(key) + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(blob)
+                os.replace(tmp, self._path(key))
+            except OSError:
+                pass  # the disk cache is only a nice-to-have
+        return blob
+
+    def load(self, level_num, sh, sw, width=None, rng=random):
+        # Handcrafted levels 5-10 pick a random enemy type every time they
+        # load, so those are always built fresh.
+        if 5 <= level_num <= 10:
+            return build_level(level_num, sh, sw, width, rng)
+        key = (level_num, sh, sw, width or 0)
+        blob = self.blobs.get(key)
+        if blob is None:
+            self.misses += 1
+            blob = self._find(key)
+            self.blobs[key] = blob
+            while len(self.blobs) > self.capacity:
+                self.blobs.popitem(last=False)
+        else:
+            self.hits += 1
+            self.blobs.move_to_end(key)
+        return unpack_level(blob)[0]
+
+LEVEL_CACHE = LevelCache(os.environ.get("CONSOLEGAME_LEVEL_CACHE"))
+
+def load_level(level_num, sh, sw, width=None, rng=random):
+    """rng only matters for handcrafted levels 5-10 (their enemy type)."""
+    if level_num > 10 and width and width >= sw * STREAM_MIN_SCREENS:
+        return stream_level(level_num, sh, sw, width)
+    return LEVEL_CACHE.load(level_num, sh, sw, width, rng)
+
+def from_pack(level_num, sw, width=None):
+    """Whether load_level looks for this level in the packs: levels 5-10 are
+    built fresh every time and the widest levels are streamed."""
+    if 5 <= level_num <= 10:
+        return False
+    return not (level_num > 10 and width and width >= sw * STREAM_MIN_SCREENS)
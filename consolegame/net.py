@@ -0,0 +1,274 @@
+"""Network play: one server steps the world, clients send keys and draw."""
+import random, struct, json
+from .levels import load_level
+from .engine import FRAME_RATE, GameClock, KEY_ACTIONS, ends_level, new_world, step
+from .render import KEY_REPEAT, KeyInput, MAX_PLAYERS, Renderer
+from .game import draw_world
+
+# ─── NETWORK PLAY ─────────────────────────────────────────
+# One server owns the world and runs step() for every player at once;
+# clients only send keys and draw. Every message is a NET_HEADER (kind,
+# payload length) and a payload. WELCOME and LEVEL are JSON and sent
+# rarely; DELTA goes out every tick and is binary: the tick, then one
+# record per thing that moved to a different cell (or vanished) since the
+# last DELTA. Most ticks that is a few enemies and whoever is walking.
+NET_PORT = 47420
+NET_WELCOME, NET_LEVEL, NET_DELTA, NET_END = range(4)
+NET_HEADER = struct.Struct("<BI")
+NET_TICK = struct.Struct("<I")
+NET_RECORDS = {b"P": struct.Struct("<Bhh"),   # player n is at x, y
+               b"E": struct.Struct("<Ihh"),   # enemy id is at x, y
+               b"e": struct.Struct("<I"),     # enemy id is gone
+               b"H": struct.Struct("<Ihh"),   # heart id is at x, y (new ones too)
+               b"h": struct.Struct("<I"),     # heart id is gone
+               b"L": struct.Struct("<Bb")}    # player n has this many lives
+NET_BUTTONS = {"left": 1, "right": 2, "jump": 4}   # a client's input byte
+
+def send_msg(sock, kind, payload=b""):
+    sock.sendall(NET_HEADER.pack(kind, len(payload)) + payload)
+
+def recv_msg(sock):
+    """(kind, payload), or (None, b"") once the other end has gone."""
+    header = recv_exact(sock, NET_HEADER.size)
+    if header is None:
+        return None, b""
+    kind, size = NET_HEADER.unpack(header)
+    payload = recv_exact(sock, size)
+    return (kind, payload) if payload is not None else (None, b"")
+
+def recv_exact(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+def net_lives(world):
+    return world["lives"] if world["lives"] is not None else [world["state"]["lives"]]
+
+class NetDelta:
+    """Remembers the cells the clients last saw and packs what changed."""
+    def __init__(self, world):
+        self.players = [None] * len(world["players"])
+        self.lives = list(net_lives(world))
+        enemies, hearts = world["enemies"], world["bonus_hearts"]
+        self.enemies = {eid: (int(enemies.x[i]), int(enemies.y[i])) for i, eid in enumerate(enemies.ids)}
+        self.hearts = {hid: (int(hearts.x[i]), int(hearts.y[i])) for i, hid in enumerate(hearts.ids)}
+
+    def encode(self, world):
+        out = [NET_TICK.pack(world["tick"])]
+        for n, p in enumerate(world["players"]):
+            cell = (int(p.x), int(p.y))
+            if cell != self.players[n]:
+                self.players[n] = cell
+                out.append(b"P" + NET_RECORDS[b"P"].pack(n, *cell))
+        for n, left in enumerate(net_lives(world)):
+            if left != self.lives[n]:
+                self.lives[n] = left
+                out.append(b"L" + NET_RECORDS[b"L"].pack(n, left))
+        for tag, store, seen in ((b"E", world["enemies"], self.enemies),
+                                 (b"H", world["bonus_hearts"], self.hearts)):
+            for i, key in enumerate(store.ids):
+                cell = (int(store.x[i]), int(store.y[i]))
+                if seen.get(key) != cell:
+                    seen[key] = cell
+                    out.append(tag + NET_RECORDS[tag].pack(key, *cell))
+            if len(seen) != len(store):
+                gone = tag.lower()
+                for key in set(seen) - set(store.slot):
+                    del seen[key]
+                    out.append(gone + NET_RECORDS[gone].pack(key))
+        return b"".join(out)
+
+    def full_size(self):
+        """What sending every position every tick would cost instead."""
+        return (NET_TICK.size + 6 * len(self.players) + 3 * len(self.lives)
+                + 11 * (len(self.enemies) + len(self.hearts)))
+
+def apply_delta(world, payload):
+    """Move a client's copy of the world to where a DELTA says things are."""
+    world["tick"], = NET_TICK.unpack_from(payload)
+    enemies, hearts, broad = world["enemies"], world["bonus_hearts"], world["broad"]
+    pos = NET_TICK.size
+    while pos < len(payload):
+        tag = payload[pos:pos + 1]
+        record = NET_RECORDS[tag]
+        fields = record.unpack_from(payload, pos + 1)
+        pos += 1 + record.size
+        if tag == b"P":
+            n, x, y = fields
+            world["players"][n].x, world["players"][n].y = x, y
+        elif tag == b"L":
+            n, left = fields
+            if world["lives"] is None:
+                world["state"]["lives"] = left
+            else:
+                world["lives"][n] = left
+                if left <= 0:
+                    world["out"].add(n)
+        elif tag == b"E" and fields[0] in enemies.slot:
+            i = enemies.slot[fields[0]]
+            enemies.x[i], enemies.y[i] = fields[1], fields[2]
+        elif tag == b"e" and fields[0] in enemies.slot:
+            enemies.remove(fields[0])
+            broad["enemies"].remove(fields[0])
+        elif tag == b"H":
+            hid, x, y = fields
+            if hid not in hearts.slot:
+                hearts.next_id = hid      # keep the server's id
+                hearts.add(x, y, 0.0, "♡")
+            i = hearts.slot[hid]
+            hearts.x[i], hearts.y[i] = x, y
+        elif tag == b"h" and fields[0] in hearts.slot:
+            hearts.remove(fields[0])
+
+def serve(players, port=NET_PORT, level_num=1, sh=24, sw=80, ticks=None, host="127.0.0.1",
+          log=print):
+    """Wait for `players` clients, then play levels for all of them until
+    everyone is out, everyone has left or `ticks` ticks have run. Returns
+    the bandwidth stats."""
+    import socket, select
+    listener = socket.create_server((host, port))
+    seat = {}       # client socket -> player index
+    log(f"waiting for {players} player(s) on {host}:{listener.getsockname()[1]}")
+    while len(seat) < players:
+        conn, addr = listener.accept()
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        send_msg(conn, NET_WELCOME, json.dumps({"player": len(seat), "players": players}).encode())
+        seat[conn] = len(seat)
+        log(f"player {len(seat)} joined from {addr[0]}:{addr[1]}")
+    listener.close()
+    game_state = {"lives": 3, "speed_bonus": 0, "player_lives": [3] * players}
+    stats = {"ticks": 0, "bytes": 0, "full": 0}
+    buttons = [0] * players     # NET_BUTTONS bits pressed since the last tick
+    result = None
+
+    def running():
+        return seat and (ticks is None or stats["ticks"] < ticks)
+
+    while result != "game_over" and running():
+        level = load_level(level_num, sh, sw)
+        info = {"num": level_num, "sh": sh, "sw": sw, "level": level}
+        world = new_world(level, game_state, sh, sw, random.Random(), players)
+        for conn in list(seat):
+            try:
+                send_msg(conn, NET_LEVEL, json.dumps(info).encode())
+            except OSError:
+                world["out"].add(seat.pop(conn))
+        delta = NetDelta(world)
+        clock = GameClock()
+        result = None
+        while result is None and running():
+            for _ in range(clock.ticks()):
+                ready, _, _ = select.select(list(seat), [], [], 0)
+                for conn in ready:
+                    try:
+                        data = conn.recv(256)
+                    except OSError:     # reset rather than closed: it's still leaving
+                        data = b""
+                    if data:
+                        for bits in data:
+                            buttons[seat[conn]] |= bits
+                    else:   # left the game: their player is out
+                        world["out"].add(seat.pop(conn))
+                inputs = [[name for name, bit in NET_BUTTONS.items() if pressed & bit]
+                          for pressed in buttons]
+                buttons = [0] * players
+                events = step(world, inputs if players > 1 else inputs[0])
+                payload = delta.encode(world)
+                for conn in list(seat):
+                    try:
+                        send_msg(conn, NET_DELTA, payload)
+                    except OSError:
+                        n = seat.pop(conn)
+                        world["out"].add(n)
+                stats["ticks"] += 1
+                stats["bytes"] += NET_HEADER.size + len(payload)
+                stats["full"] += NET_HEADER.size + delta.full_size()
+                result = ends_level(events)
+                if result is not None or not running():
+                    break
+            clock.wait()
+        if result == "complete":
+            level_num += 1
+    for conn in seat:
+        try:
+            send_msg(conn, NET_END, json.dumps({"result": result or "stopped"}).encode())
+        except OSError:
+            pass
+        conn.close()
+    return stats
+
+def serve_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python3 -m consolegame --serve",
+                                     description="Host a game that other terminals join with --connect.")
+    parser.add_argument("--players", type=int, default=2, help=f"players to wait for (1-{MAX_PLAYERS})")
+    parser.add_argument("--port", type=int, default=NET_PORT)
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: this machine only)")
+    parser.add_argument("--level", type=int, default=1, help="level to start on")
+    parser.add_argument("--size", default="24x80", help="screen size as ROWSxCOLS the clients must match")
+    parser.add_argument("--ticks", type=int, default=None, help="stop after this many ticks")
+    args = parser.parse_args(argv)
+    sh, sw = (int(n) for n in args.size.lower().split("x"))
+    stats = serve(max(1, min(args.players, MAX_PLAYERS)), args.port, args.level, sh, sw,
+                  args.ticks, args.host)
+    ticks = max(stats["ticks"], 1)
+    print(f"ticks: {stats['ticks']}  sent per client: {stats['bytes']} B  "
+          f"({stats['bytes'] / ticks:.1f} B/tick, full snapshots would be {stats['full'] / ticks:.1f} B/tick)")
+    return 0
+
+def net_client(stdscr, host, port=NET_PORT, key_repeat=KEY_REPEAT):
+    """Join a --serve game: send our keys, draw the world the server sends."""
+    import socket, select
+    sock = socket.create_connection((host, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    kind, payload = recv_msg(sock)
+    if kind != NET_WELCOME:
+        return "refused"
+    welcome = json.loads(payload)
+    me = welcome["player"]
+    stdscr.nodelay(True)
+    keys = KeyInput(stdscr, key_repeat)
+    sh, sw = stdscr.getmaxyx()
+    world = renderer = None
+    game_state = {"lives": 3, "speed_bonus": 0}
+    try:
+        while True:
+            changed = False
+            while select.select([sock], [], [], 0)[0]:
+                kind, payload = recv_msg(sock)
+                if kind is None:
+                    return "disconnected"
+                if kind == NET_END:
+                    return json.loads(payload)["result"]
+                if kind == NET_LEVEL:
+                    info = json.loads(payload)
+                    if (info["sh"], info["sw"]) != (sh, sw):
+                        return "wrong size"
+                    world = new_world(info["level"], game_state, sh, sw,
+                                      players=welcome["players"])
+                    renderer = Renderer(stdscr)
+                    renderer.set_static(info["level"])
+                elif kind == NET_DELTA and world is not None:
+                    apply_delta(world, payload)
+                changed = True
+            if changed and world is not None:
+                draw_world(renderer, world, follow=me)
+                renderer.present()
+            bits = 0
+            for key in keys.poll():
+                if key in KEY_ACTIONS:
+                    bits |= NET_BUTTONS[KEY_ACTIONS[key]]
+                elif key == 2:   # Ctrl+B: leave
+                    return "left"
+            if bits:
+                try:
+                    sock.sendall(bytes((bits,)))
+                except OSError:
+                    return "disconnected"
+            select.select([sock], [], [], 1.0 / FRAME_RATE)
+    finally:
+        sock.close()
@@ -0,0 +1,469 @@
+"""Screens (curses, ANSI escapes, in memory), key input, the diff renderer
+and the HUD."""
+import curses, time, sys, os
+from collections import deque
+from .engine import KEY_ACTIONS
+
+# ─── Rename Terminal Tab ─────────────────────────────
+def rename_tab():
+    """This ANSI escape sequence will (in many terminals) rename the tab.
+    Done when the game starts on a terminal, not on import."""
+    if sys.stdout.isatty():
+        print("\033]0;PLAYING - STARBUCKS-=-PLATFORMER\a")
+
+# ─── SCREEN BACKENDS ─────────────────────────────────────
+# Everything that draws or reads keys takes a "screen" with the curses
+# window calls the game uses (getmaxyx, addstr, addch, erase, clear,
+# refresh, getch, nodelay) plus color_pair(n), now() and sleep(s) so time
+# can be faked too, wait_key(timeout) to sleep until a key comes in,
+# fileno() for the file keys arrive on (None on a fake screen) and
+# start()/stop() to set the terminal up and put it back. run_on_screen()
+# is curses.wrapper for any of them.
+class CursesScreen:
+    """The real terminal through curses; drawing calls go straight to the window."""
+    def __init__(self, stdscr):
+        self.window = stdscr
+        self.getmaxyx = stdscr.getmaxyx
+        self.addstr = stdscr.addstr
+        self.addch = stdscr.addch
+        self.erase = stdscr.erase
+        self.clear = stdscr.clear
+        self.refresh = stdscr.refresh
+        self.getch = stdscr.getch
+        self.now = time.monotonic
+        self.sleep = time.sleep
+        self.delay = True
+
+    def nodelay(self, flag):
+        self.delay = not flag
+        self.window.nodelay(flag)
+
+    def wait_key(self, timeout=None):
+        # a blocking getch sleeps in the kernel; the key goes back for the
+        # caller's next getch
+        self.window.timeout(-1 if timeout is None else int(timeout * 1000))
+        key = self.window.getch()
+        self.window.nodelay(not self.delay)
+        if key == -1:
+            return False
+        curses.ungetch(key)
+        return True
+
+    def start(self):
+        curses.curs_set(0)
+        curses.start_color()
+        try:
+            curses.init_pair(1, curses.COLOR_RED, curses.COLOR_BLACK)
+        except curses.error:
+            pass
+
+    def stop(self):
+        pass  # curses.wrapper restores the terminal
+
+    def color_pair(self, n):
+        return curses.color_pair(n)
+
+    def fileno(self):
+        return sys.stdin.fileno()
+
+class ScriptEnded(Exception):
+    """A MemoryScreen ran out of scripted keys while the game still wanted one."""
+
+class MemoryScreen:
+    """A screen that is just a dict of cells: counts every call and cell
+    written, plays keys from a script, and runs on a fake clock so sleeps
+    cost nothing. With a script, the game waiting for a key after the last
+    one raises ScriptEnded; -1 in the script is a frame with no key."""
+    def __init__(self, sh=24, sw=80, keys=None):
+        self.sh, self.sw = sh, sw
+        self.cells = {}
+        self.calls = 0
+        self.chars = 0
+        self.refreshes = 0
+        self.keys = deque(keys) if keys is not None else None
+        self.delay = True
+        self.clock = 0.0
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def getmaxyx(self):
+        return self.sh, self.sw
+
+    def addstr(self, y, x, text, attr=0):
+        self.calls += 1
+        self.chars += len(text)
+        for i, ch in enumerate(text):
+            self.cells[(y, x + i)] = ch
+
+    def addch(self, y, x, ch, attr=0):
+        self.addstr(y, x, ch, attr)
+
+    def erase(self):
+        self.cells.clear()
+
+    clear = erase
+
+    def refresh(self):
+        self.refreshes += 1
+
+    def nodelay(self, flag):
+        self.delay = not flag
+
+    def getch(self):
+        if self.keys is None:
+            return -1
+        while self.keys:
+            key = self.keys.popleft()
+            if key != -1 or not self.delay:
+                return key
+        raise ScriptEnded()
+
+    def wait_key(self, timeout=None):
+        while self.keys and self.keys[0] == -1:
+            self.keys.popleft()
+        if self.keys:
+            return True
+        if self.keys is None or timeout is not None:
+            self.clock += timeout or 0
+            return False
+        raise ScriptEnded()
+
+    def color_pair(self, n):
+        return n << 8
+
+    def fileno(self):
+        return None
+
+    def now(self):
+        return self.clock
+
+    def sleep(self, seconds):
+        self.clock += seconds
+
+    def text(self):
+        """What the screen shows, one string per row."""
+        return ["".join(self.cells.get((y, x), " ") for x in range(self.sw)).rstrip()
+                for y in range(self.sh)]
+
+ANSI_KEYS = {b"\x1b[A": curses.KEY_UP, b"\x1b[B": curses.KEY_DOWN,
+             b"\x1b[C": curses.KEY_RIGHT, b"\x1b[D": curses.KEY_LEFT,
+             b"\x1b[5~": curses.KEY_PPAGE, b"\x1b[6~": curses.KEY_NPAGE}
+
+class AnsiScreen:
+    """Draws with bare ANSI escapes: calls append to a byte buffer and
+    refresh() sends the whole frame in one write. Keys come from stdin in
+    raw mode, arrow keys turned into the curses KEY_ codes."""
+    def __init__(self, out=None, inp=None, size=None):
+        self.out = sys.stdout.fileno() if out is None else out
+        self.inp = sys.stdin.fileno() if inp is None else inp
+        if size is None:
+            size = os.get_terminal_size(self.out)
+            size = (size.lines, size.columns)
+        self.sh, self.sw = size
+        self.buf = bytearray()
+        self.typed = b""        # keys read from stdin but not handed out yet
+        self.delay = True
+        self.saved_tty = None
+        self.frames = 0
+        self.bytes_written = 0  # everything refresh() has sent, for the Ctrl+T readout
+        self.last_written = 0   # ...and what the last refresh() sent
+        self.now = time.monotonic
+        self.sleep = time.sleep
+
+    def start(self):
+        import termios, tty
+        self.saved_tty = termios.tcgetattr(self.inp)
+        tty.setraw(self.inp)  # raw, so Ctrl+S/Ctrl+Z reach the game
+        os.write(self.out, b"\x1b[?1049h\x1b[?25l\x1b[2J")
+
+    def stop(self):
+        import termios
+        os.write(self.out, b"\x1b[0m\x1b[?25h\x1b[?1049l")
+        if self.saved_tty is not None:
+            termios.tcsetattr(self.inp, termios.TCSADRAIN, self.saved_tty)
+
+    def getmaxyx(self):
+        return self.sh, self.sw
+
+    def addstr(self, y, x, text, attr=0):
+        self.buf += b"\x1b[%d;%dH" % (y + 1, x + 1)
+        if attr:
+            self.buf += b"\x1b[31m" + text.encode("utf-8") + b"\x1b[0m"
+        else:
+            self.buf += text.encode("utf-8")
+
+    def addch(self, y, x, ch, attr=0):
+        self.addstr(y, x, ch, attr)
+
+    def erase(self):
+        self.buf += b"\x1b[2J"
+
+    clear = erase
+
+    def refresh(self):
+        if self.buf:
+            os.write(self.out, bytes(self.buf))
+            self.bytes_written += len(self.buf)
+        self.last_written = len(self.buf)
+        self.buf.clear()
+        self.frames += 1
+
+    def nodelay(self, flag):
+        self.delay = not flag
+
+    def wait_key(self, timeout=None):
+        import select
+        return bool(self.typed) or bool(select.select([self.inp], [], [], timeout)[0])
+
+    def fileno(self):
+        return self.inp
+
+    def getch(self):
+        import select
+        if not self.typed:
+            ready, _, _ = select.select([self.inp], [], [], None if self.delay else 0)
+            if not ready:
+                return -1
+            self.typed = os.read(self.inp, 4096)  # everything typed since the last read
+        for seq, key in ANSI_KEYS.items():
+            if self.typed.startswith(seq):
+                self.typed = self.typed[len(seq):]
+                return key
+        key = self.typed[0]
+        self.typed = self.typed[1:]
+        if key == 3:
+            raise KeyboardInterrupt  # raw mode swallows Ctrl+C's signal
+        return key
+
+    def color_pair(self, n):
+        return n
+
+def run_on_screen(screen, fn, *args):
+    """Call fn(screen, *args) with the terminal set up, and put it back
+    however fn exits. screen is "curses", "ansi" or a screen object."""
+    if screen == "curses":
+        return curses.wrapper(lambda stdscr: run_on_screen(CursesScreen(stdscr), fn, *args))
+    if screen == "ansi":
+        screen = AnsiScreen()
+    screen.start()
+    try:
+        return fn(screen, *args)
+    finally:
+        screen.stop()
+
+# Terminals only send key presses, never releases, and a held key arrives
+# as the OS's auto-repeat. With repeat on, KeyInput turns that into held
+# state: a movement key counts as held until its auto-repeat stops for
+# KEY_RELEASE seconds, and while held it fires at a steady `repeat` per
+# second no matter how fast the terminal repeats. Pressing another
+# movement key lets go of the old one (auto-repeat only repeats the last).
+KEY_REPEAT = 0          # held-key fires per second; 0 = every press is one move, as before
+KEY_RELEASE = 0.15      # seconds without auto-repeat before a held key is let go
+
+class KeyInput:
+    def __init__(self, screen, repeat=KEY_REPEAT, release=KEY_RELEASE, held_keys=None):
+        self.screen = screen
+        self.repeat = repeat
+        self.release = release
+        self.held_keys = held_keys if held_keys is not None else KEY_ACTIONS
+        self.held = {}      # key -> [last seen, next fire]
+
+    def poll(self):
+        """Every key waiting right now, plus repeats of held keys that are due."""
+        keys = []
+        key = self.screen.getch()
+        while key != -1:
+            keys.append(key)
+            key = self.screen.getch()
+        if not self.repeat:
+            return keys
+        now = self.screen.now()
+        out = []
+        for key in keys:
+            if key not in self.held_keys:
+                out.append(key)
+            elif key in self.held:
+                self.held[key][0] = now   # auto-repeat: still held
+            else:
+                self.held.clear()
+                self.held[key] = [now, now + 1.0 / self.repeat]
+                out.append(key)
+        for key, state in list(self.held.items()):
+            if now - state[0] > self.release:
+                del self.held[key]
+            elif now >= state[1]:
+                out.append(key)
+                state[1] = max(state[1] + 1.0 / self.repeat, now)
+        return out
+
+    def wait(self, timeout=None):
+        """Block (no CPU) until a key is pressed or timeout seconds pass."""
+        self.held.clear()
+        return self.screen.wait_key(timeout)
+
+# Local multiplayer: player 1 keeps Ctrl+A/D/W, then a/d/w, j/l/i and the arrows.
+LOCAL_KEYS = (KEY_ACTIONS,
+              {ord("a"): "left", ord("d"): "right", ord("w"): "jump"},
+              {ord("j"): "left", ord("l"): "right", ord("i"): "jump"},
+              {curses.KEY_LEFT: "left", curses.KEY_RIGHT: "right", curses.KEY_UP: "jump"})
+PLAYER_GLYPHS = "P234"
+MAX_PLAYERS = len(LOCAL_KEYS)
+
+# ─── DIFF RENDERER ───────────────────────────────────────────
+BLANK = (" ", 0)
+
+class Renderer:
+    """Back-buffered drawing for play_level. Static geometry (platforms,
+    planes, lava, goal) is laid down once per level in level coordinates,
+    moving things are drawn into a fresh frame each time in screen
+    coordinates, and present() only sends the cells that differ from what
+    the terminal already shows. Takes the same addstr/addch calls as stdscr
+    so draw_hud and friends work on either."""
+    def __init__(self, stdscr):
+        self.stdscr = stdscr
+        self.sh, self.sw = stdscr.getmaxyx()
+        self.static = {}      # (y, level x) -> (ch, attr), drawn once per level
+        self.width = self.sw  # level width in columns
+        self.cam_x = 0        # level column shown at the left edge
+        self.shown_cam_x = 0
+        self.frame = {}       # (y, x) -> (ch, attr), this frame's moving stuff
+        self.last_frame = {}
+        self.shown = {}       # what the terminal has on it right now
+        self.dirty_all = True
+        self.last_cells = 0   # cells sent by the last present()
+        self.last_bytes = 0   # rough bytes those cells cost on the wire
+        self.total_bytes = 0
+        self.frames = 0
+        self.lava_attr = stdscr.color_pair(1)
+
+    def _paint(self, cells, y, x, text, attr, limit):
+        y = int(y)
+        x = int(x)
+        if y < 0 or y >= self.sh:
+            return
+        for i, ch in enumerate(text):
+            if 0 <= x + i < limit:
+                cells[(y, x + i)] = (ch, attr)
+
+    def addstr(self, y, x, text, attr=0):
+        self._paint(self.frame, y, x, text, attr, self.sw)
+
+    def addch(self, y, x, ch, attr=0):
+        self._paint(self.frame, y, x, ch, attr, self.sw)
+
+    def set_static(self, level):
+        """Lay down the geometry that never moves for this level."""
+        self.static = {}
+        self.width = level.get("width", self.sw)
+        self.paint_static(level)
+        goal = level["goal"]
+        if goal:
+            for i in range(goal['height']):
+                self._paint(self.static, goal['y'] + i, goal['x'], "H" * goal['width'], 0, self.width)
+        self.dirty_all = True
+
+    def paint_static(self, part):
+        """Add the platforms, planes and lava of a level or streamed chunk."""
+        width = self.width
+        for plat in part["platforms"]:
+            self._paint(self.static, plat['y'], plat['x'], "█" * plat['w'], 0, width)
+        for plane in part.get("planes", []):
+            self._paint(self.static, plane['y'], plane['x'], "X" * plane['w'], 0, width)
+        for lava in part.get("lava", []):
+            self._paint(self.static, lava['y'], lava['x'], "~" * lava['w'], self.lava_attr, width)
+        self.shown_cam_x = None  # recheck the whole view next frame
+
+    def clear_static(self, x0, x1):
+        """Forget static cells in columns x0..x1-1 (a chunk that was dropped)."""
+        for pos in [pos for pos in self.static if x0 <= pos[1] < x1]:
+            del self.static[pos]
+        self.shown_cam_x = None
+
+    def scroll_to(self, cam_x):
+        self.cam_x = cam_x
+
+    def invalidate(self):
+        """Someone else drew on the screen; repaint everything next frame."""
+        self.stdscr.clear()
+        self.shown = {}
+        self.dirty_all = True
+
+    def present(self, refresh=True):
+        """Write this frame's changes; refresh=False leaves the refresh() to
+        the caller (the profiler times it on its own)."""
+        cam_x = self.cam_x
+        if self.dirty_all:
+            self.stdscr.erase()
+            self.shown = {}
+            self.dirty_all = False
+            dirty = [(y, x) for y in range(self.sh) for x in range(self.sw)]
+        elif cam_x != self.shown_cam_x:
+            # The view scrolled, so any cell on screen may have changed.
+            dirty = [(y, x) for y in range(self.sh) for x in range(self.sw)]
+        else:
+            dirty = set(self.frame) | set(self.last_frame)
+        self.shown_cam_x = cam_x
+        static = self.static
+        # Work out which cells changed, then group them into runs along a row
+        # so each run costs one cursor move and one addstr.
+        changed = []
+        for pos in dirty:
+            want = self.frame.get(pos) or static.get((pos[0], pos[1] + cam_x)) or BLANK
+            if self.shown.get(pos, BLANK) != want:
+                changed.append((pos, want))
+                if want == BLANK:
+                    self.shown.pop(pos, None)
+                else:
+                    self.shown[pos] = want
+        changed.sort()
+        nbytes = 0
+        run_y = run_x = run_attr = None
+        run = []
+        for (y, x), (ch, attr) in changed + [((None, None), (None, None))]:
+            if run and (y != run_y or x != run_x + len(run) or attr != run_attr):
+                text = "".join(run)
+                try:
+                    self.stdscr.addstr(run_y, run_x, text, run_attr)
+                except curses.error:
+                    pass  # bottom-right cell always "fails" after writing
+                nbytes += len("\033[%d;%dH" % (run_y + 1, run_x + 1)) + len(text.encode("utf-8"))
+                if run_attr:
+                    nbytes += len("\033[31m\033[0m")
+                run = []
+            if y is None:
+                break
+            if not run:
+                run_y, run_x, run_attr = y, x, attr
+            run.append(ch)
+        if refresh:
+            self.stdscr.refresh()
+        self.last_cells = len(changed)
+        self.last_bytes = nbytes
+        self.total_bytes += nbytes
+        self.frames += 1
+        self.last_frame = self.frame
+        self.frame = {}
+
+# ─── HUD DRAWING ─────────────────────────────────────────────
+def draw_hud(stdscr, game_state, sh, sw):
+    lives = game_state["lives"]
+    hearts = ""
+    for i in range(3):
+        if i < lives:
+            hearts += "♡ "
+        else:
+            hearts += "♥ "
+    if "player_lives" in game_state:   # local multiplayer: everyone's hearts
+        hearts = " ".join(f"{PLAYER_GLYPHS[n]}{'♡' * max(left, 0)}"
+                          for n, left in enumerate(game_state["player_lives"])) + " "
+    try:
+        stdscr.addstr(0, 0, "Lives: " + hearts)
+        box_text = " [♥ ♥ ♥] "
+        stdscr.addstr(0, sw - len(box_text) - 1, box_text)
+        stdscr.addstr(1, 0, "Ctrl+S = Pause   Ctrl+Z = Continue")
+    except curses.error:
+        pass
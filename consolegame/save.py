@@ -0,0 +1,385 @@
+"""Save files: a base and incremental checkpoints of a running world."""
+import random, math, os, threading, struct
+from array import array
+from .levels import ENEMY_TYPES, HEART_RECORD, pack_level, stream_level, unpack_level
+from .engine import (EnemyStore, HeartStore, TICK_RATE, build_broad_phase, load_chunk, load_numpy,
+                     new_world, unload_chunk)
+
+# ─── SAVE GAMES ───────────────────────────────────────────
+# A save file is a base followed by checkpoints:
+#   base        SAVE_HEADER, the packed level (nothing for a streamed
+#               level, which rebuilds from its number), then a checkpoint
+#               holding the whole world
+#   checkpoint  SAVE_RECORD (length, crc32), then only what changed since
+#               the checkpoint before: tick, lives, players that moved,
+#               enemies and hearts that moved, appeared or went, and the
+#               RNG state and streamed chunks if they changed
+# The game only copies the world's columns (capture_world); packing and
+# writing happen on a background thread. Checkpoints are appended, so a
+# crash can only tear the last one, and load_save stops at the first
+# record whose crc is wrong. A level start, and every SAVE_COMPACT_EVERY
+# checkpoints, rewrites the file as a fresh base through a temp file and
+# os.replace, so resuming never replays more than a few hundred deltas.
+SAVE_VERSION = 3
+SAVE_MAGIC = b"CGSV"
+SAVE_HEADER = struct.Struct("<4sHiHHIBbI")   # magic, version, level, sh, sw, width, players, speed bonus, level bytes
+SAVE_RECORD = struct.Struct("<II")           # checkpoint length, crc32
+SAVE_ENDLESS = 0xFFFFFFFF                    # the width of an endless level
+CHECKPOINT_HEAD = struct.Struct("<IiBBBBII") # tick, lives, player lives, players moved, flags, gridded, next enemy id, next heart id
+CHECKPOINT_RNG, CHECKPOINT_STREAM = 1, 2     # flags: the RNG state / streamed chunks follow
+SAVE_COUNTS = struct.Struct("<III")          # gone, moved, added
+RNG_STATE = struct.Struct("<625I?d")         # Mersenne Twister words, gauss_next set, gauss_next
+PLAYER_STATE = struct.Struct("<ddddHH?")     # x, y, vx, vy, width, height, jumping
+ENEMY_MOVE = struct.Struct("<Iddddd")        # id, x, y, vx, vy, phase
+SAVE_ENEMY = struct.Struct("<dddddHHddBd")   # x, y, vx, vy, phase, width, height, min_x, max_x, type, base_y
+HEART_MOVE = struct.Struct("<Idd")           # id, x, y
+SAVE_ID = struct.Struct("<I")
+SAVE_CHUNK = struct.Struct("<iH")            # chunk index, enemies it brought
+BROAD_KINDS = ("platforms", "planes", "lava", "enemies", "bonus_hearts")
+SAVE_EVERY_TICKS = TICK_RATE                 # play_level checkpoints once a second
+SAVE_COMPACT_EVERY = 256
+
+def copy_column(column):
+    numpy = load_numpy()
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        return column.copy()
+    return array('d', column)
+
+def capture_world(world):
+    """Everything in a world that can change, copied (not packed) so it is
+    cheap to take every second and the game can carry on while it's saved."""
+    enemies, hearts, broad = world["enemies"], world["bonus_hearts"], world["broad"]
+    capture = {"tick": world["tick"],
+               "lives": world["state"]["lives"],
+               "player_lives": list(world["lives"] or ()),
+               "players": [(p.x, p.y, p.vx, p.vy, p.w, p.h, p.jumping) for p in world["players"]],
+               "rng": world["rng"].getstate(),
+               "gridded": [broad[kind].gridded for kind in BROAD_KINDS],
+               "enemies": {"ids": list(enemies.ids), "next_id": enemies.next_id, "type": list(enemies.type)},
+               "hearts": {"ids": list(hearts.ids), "next_id": hearts.next_id, "symbol": list(hearts.symbol)}}
+    for name in EnemyStore.COLUMNS:
+        capture["enemies"][name] = copy_column(getattr(enemies, name))
+    for name in ("x", "y", "vx"):
+        capture["hearts"][name] = copy_column(getattr(hearts, name))
+    if "stream" in world:
+        capture["stream"] = {index: tuple(live["enemies"])
+                             for index, live in world["stream"]["live"].items()}
+    return capture
+
+def diff_rows(old, new, moving):
+    """(ids gone, rows moved, rows added) going from one captured store to
+    the next; a row moved if any of the `moving` columns changed."""
+    ids = new["ids"]
+    if old is None:
+        return [], [], range(len(ids))
+    if old["ids"] == ids:
+        numpy = load_numpy()
+        if numpy is not None and isinstance(new["x"], numpy.ndarray):
+            changed = numpy.zeros(len(ids), dtype=bool)
+            for name in moving:
+                changed |= new[name] != old[name]
+            return [], numpy.nonzero(changed)[0].tolist(), []
+        return [], [i for i in range(len(ids)) if any(new[name][i] != old[name][i] for name in moving)], []
+    slot = {key: j for j, key in enumerate(old["ids"])}
+    moved, added = [], []
+    for i, key in enumerate(ids):
+        j = slot.pop(key, None)
+        if j is None:
+            added.append(i)
+        elif any(new[name][i] != old[name][j] for name in moving):
+            moved.append(i)
+    return list(slot), moved, added
+
+def pack_checkpoint(old, new):
+    """What changed from capture old to capture new, packed; old=None packs
+    all of new."""
+    flags = 0
+    if old is None or new["rng"] != old["rng"]:
+        flags |= CHECKPOINT_RNG
+    if "stream" in new and (old is None or new["stream"] != old.get("stream")):
+        flags |= CHECKPOINT_STREAM
+    moved = [(n, p) for n, p in enumerate(new["players"]) if old is None or old["players"][n] != p]
+    gridded = sum(1 << i for i, g in enumerate(new["gridded"]) if g)
+    e, h = new["enemies"], new["hearts"]
+    parts = [CHECKPOINT_HEAD.pack(new["tick"], new["lives"], len(new["player_lives"]), len(moved),
+                                  flags, gridded, e["next_id"], h["next_id"]),
+             struct.pack(f"<{len(new['player_lives'])}b", *new["player_lives"])]
+    for n, p in moved:
+        parts.append(bytes((n,)) + PLAYER_STATE.pack(*p))
+    if flags & CHECKPOINT_RNG:
+        _, words, gauss = new["rng"]
+        parts.append(RNG_STATE.pack(*words, gauss is not None, gauss or 0.0))
+    gone, moved, added = diff_rows(old and old["enemies"], e, ("x", "y", "vx", "vy", "phase"))
+    parts.append(SAVE_COUNTS.pack(len(gone), len(moved), len(added)))
+    parts.extend(SAVE_ID.pack(key) for key in gone)
+    parts.extend(ENEMY_MOVE.pack(e["ids"][i], e["x"][i], e["y"][i], e["vx"][i], e["vy"][i], e["phase"][i])
+                 for i in moved)
+    parts.extend(SAVE_ID.pack(e["ids"][i]) +
+                 SAVE_ENEMY.pack(e["x"][i], e["y"][i], e["vx"][i], e["vy"][i], e["phase"][i],
+                                 int(e["w"][i]), int(e["h"][i]), e["min_x"][i], e["max_x"][i],
+                                 ENEMY_TYPES.index(e["type"][i]), e["base_y"][i])
+                 for i in added)
+    gone, moved, added = diff_rows(old and old["hearts"], h, ("x", "y"))
+    parts.append(SAVE_COUNTS.pack(len(gone), len(moved), len(added)))
+    parts.extend(SAVE_ID.pack(key) for key in gone)
+    parts.extend(HEART_MOVE.pack(h["ids"][i], h["x"][i], h["y"][i]) for i in moved)
+    parts.extend(SAVE_ID.pack(h["ids"][i]) +
+                 HEART_RECORD.pack(h["x"][i], h["y"][i], h["vx"][i], h["symbol"][i].encode("utf-8"))
+                 for i in added)
+    if flags & CHECKPOINT_STREAM:
+        parts.append(struct.pack("<H", len(new["stream"])))
+        for index, ids in sorted(new["stream"].items()):
+            parts.append(SAVE_CHUNK.pack(index, len(ids)) + struct.pack(f"<{len(ids)}I", *ids))
+    return b"".join(parts)
+
+def apply_checkpoint(state, buf):
+    """Bring a load_save state up to date with one packed checkpoint."""
+    (state["tick"], state["lives"], lives, moved, flags, gridded,
+     state["enemy_next"], state["heart_next"]) = CHECKPOINT_HEAD.unpack_from(buf)
+    pos = CHECKPOINT_HEAD.size
+    state["player_lives"] = list(struct.unpack_from(f"<{lives}b", buf, pos))
+    pos += lives
+    for _ in range(moved):
+        state["players"][buf[pos]] = PLAYER_STATE.unpack_from(buf, pos + 1)
+        pos += 1 + PLAYER_STATE.size
+    if flags & CHECKPOINT_RNG:
+        *words, has_gauss, gauss = RNG_STATE.unpack_from(buf, pos)
+        state["rng"] = (3, tuple(words), gauss if has_gauss else None)
+        pos += RNG_STATE.size
+    state["gridded"] = [bool(gridded & (1 << i)) for i in range(len(BROAD_KINDS))]
+    for kind, move, record in (("enemies", ENEMY_MOVE, SAVE_ENEMY), ("hearts", HEART_MOVE, HEART_RECORD)):
+        rows = state[kind]      # id -> list of fields, in store order
+        gone, moved, added = SAVE_COUNTS.unpack_from(buf, pos)
+        pos += SAVE_COUNTS.size
+        for _ in range(gone):
+            del rows[SAVE_ID.unpack_from(buf, pos)[0]]
+            pos += SAVE_ID.size
+        for _ in range(moved):
+            key, *where = move.unpack_from(buf, pos)
+            rows[key][:len(where)] = where
+            pos += move.size
+        for _ in range(added):
+            key, = SAVE_ID.unpack_from(buf, pos)
+            rows[key] = list(record.unpack_from(buf, pos + SAVE_ID.size))
+            pos += SAVE_ID.size + record.size
+    if flags & CHECKPOINT_STREAM:
+        count, = struct.unpack_from("<H", buf, pos)
+        pos += 2
+        state["stream"] = {}
+        for _ in range(count):
+            index, n = SAVE_CHUNK.unpack_from(buf, pos)
+            pos += SAVE_CHUNK.size
+            state["stream"][index] = struct.unpack_from(f"<{n}I", buf, pos)
+            pos += 4 * n
+
+def load_save(path):
+    """The game in a save file as of its last good checkpoint: a dict with
+    the level, its number, screen size, player count and speed bonus, and
+    the world "state" for restore_world(). None if there's no usable save."""
+    import zlib
+    try:
+        with open(path, "rb") as f:
+            buf = f.read()
+    except OSError:
+        return None
+    if len(buf) < SAVE_HEADER.size:
+        return None
+    magic, version, level_num, sh, sw, width, players, bonus, size = SAVE_HEADER.unpack_from(buf)
+    if magic != SAVE_MAGIC or version != SAVE_VERSION:
+        return None
+    pos = SAVE_HEADER.size
+    if size:
+        level = unpack_level(buf, pos)[0]
+    else:
+        level = stream_level(level_num, sh, sw, math.inf if width == SAVE_ENDLESS else width)
+    pos += size
+    state = {"players": {}, "enemies": {}, "hearts": {}}
+    checkpoints = 0
+    while pos + SAVE_RECORD.size <= len(buf):
+        length, crc = SAVE_RECORD.unpack_from(buf, pos)
+        payload = buf[pos + SAVE_RECORD.size:pos + SAVE_RECORD.size + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break   # torn by a crash mid-write: everything before it is good
+        apply_checkpoint(state, payload)
+        checkpoints += 1
+        pos += SAVE_RECORD.size + length
+    if not checkpoints:
+        return None
+    return {"level": level, "level_num": level_num, "sh": sh, "sw": sw, "players": players,
+            "speed_bonus": bonus, "state": state, "checkpoints": checkpoints}
+
+def restore_ids(store, ids, next_id):
+    store.ids = list(ids)
+    store.slot = {key: i for i, key in enumerate(store.ids)}
+    store.next_id = next_id
+
+def restore_world(save, game_state):
+    """The world exactly as a load_save() dict left it, ready for step()."""
+    state = save["state"]
+    game_state["lives"] = state["lives"]
+    game_state["speed_bonus"] = save["speed_bonus"]
+    if save["players"] > 1:
+        game_state["player_lives"] = list(state["player_lives"])
+    # The level's own enemies and hearts would only be thrown away.
+    level = save["level"]
+    world = new_world(dict(level, enemies=[], bonus_hearts=[]), game_state,
+                      save["sh"], save["sw"], random.Random(), save["players"])
+    world["level"] = level
+    world["tick"] = state["tick"]
+    world["rng"].setstate(state["rng"])
+    for n, p in state["players"].items():
+        player = world["players"][n]
+        player.x, player.y, player.vx, player.vy, player.w, player.h, player.jumping = p
+    stream = world.get("stream")
+    if stream:
+        for index in list(stream["live"]):
+            unload_chunk(world, index)
+        stream.pop("window", None)
+    world["enemies"] = EnemyStore(({'x': x, 'y': y, 'vx': vx, 'vy': vy, 'phase': phase,
+                                    'width': w, 'height': h, 'min_x': lo, 'max_x': hi,
+                                    'type': ENEMY_TYPES[t], 'base_y': base_y}
+                                   for x, y, vx, vy, phase, w, h, lo, hi, t, base_y in state["enemies"].values()),
+                                  list(state["enemies"]), state["enemy_next"])
+    world["bonus_hearts"] = HeartStore({'x': x, 'y': y, 'vx': vx, 'symbol': symbol.rstrip(b"\0").decode("utf-8")}
+                                       for x, y, vx, symbol in state["hearts"].values())
+    restore_ids(world["bonus_hearts"], state["hearts"], state["heart_next"])
+    world["broad"].update(build_broad_phase(world, kinds=("enemies", "bonus_hearts")))
+    if stream:
+        for index, ids in sorted(state.get("stream", {}).items()):
+            load_chunk(world, stream["cache"].get(stream["level"], index, save["sh"]), ids)
+    for kind, gridded in zip(BROAD_KINDS, state["gridded"]):
+        if gridded and not world["broad"][kind].gridded:
+            world["broad"][kind]._build_grid()
+    return world
+
+class SaveGame:
+    """Keeps a save file up to date with the game. start_level() and
+    checkpoint() only take a capture; one background thread packs and
+    writes them in order. A checkpoint that is still waiting when the next
+    one comes in is dropped, which costs nothing since each is stored as a
+    change from whatever was written last."""
+    def __init__(self, path, compact_every=SAVE_COMPACT_EVERY, background=True):
+        self.path = path
+        self.compact_every = compact_every
+        self.background = background
+        self.lock = threading.Lock()
+        self.waiting = []       # ("base", (header, capture)) and ("checkpoint", capture)
+        self.running = False    # the writer has work
+        self.pool = None        # started on the first write
+        self.future = None
+        self.file = None        # the save, open for appending
+        self.header = None      # SAVE_HEADER and the packed level of the current base
+        self.written = None     # the capture the file is up to date with
+        self.since_base = 0
+        self.checkpoints = 0
+        self.error = None       # why the file is behind the game, if it is (an OSError)
+
+    def start_level(self, world, level_num):
+        """Start the file over for the level the world is playing."""
+        level = world["level"]
+        blob = b"" if "stream" in level else pack_level(level, level_num, world["sh"], world["sw"])
+        width = level.get("width") or 0
+        header = SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, level_num, world["sh"], world["sw"],
+                                  SAVE_ENDLESS if width == math.inf else width, len(world["players"]),
+                                  world["state"].get("speed_bonus", 0), len(blob)) + blob
+        self._submit("base", (header, capture_world(world)))
+
+    def checkpoint(self, world):
+        self._submit("checkpoint", capture_world(world))
+
+    def _submit(self, kind, item):
+        with self.lock:
+            if kind == "checkpoint" and self.waiting and self.waiting[-1][0] == "checkpoint":
+                self.waiting[-1] = (kind, item)
+            else:
+                self.waiting.append((kind, item))
+            if self.running:
+                return
+            self.running = True
+        if not self.background:
+            self._drain()
+            return
+        if self.pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save")
+        self.future = self.pool.submit(self._drain)
+
+    def _drain(self):
+        while True:
+            with self.lock:
+                if not self.waiting:
+                    self.running = False
+                    return
+                kind, item = self.waiting.pop(0)
+            try:
+                if kind == "base":
+                    self.header = item[0]
+                    self._write_base(item[1])
+                elif self.file is not None:
+                    self._append(item)
+                elif self.header is not None:
+                    self._write_base(item)   # the last base never made it to disk
+            except OSError as e:
+                self.error = e
+                if self.file is not None:
+                    self.file.close()
+                    self.file = None
+
+    def _write_base(self, capture):
+        import zlib
+        payload = pack_checkpoint(None, capture)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.header + SAVE_RECORD.pack(len(payload), zlib.crc32(payload)) + payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        if self.file is not None:
+            self.file.close()
+        self.file = open(self.path, "ab")
+        self.written = capture
+        self.since_base = 0
+        self.error = None
+
+    def _append(self, capture):
+        import zlib
+        payload = pack_checkpoint(self.written, capture)
+        try:
+            self.file.write(SAVE_RECORD.pack(len(payload), zlib.crc32(payload)) + payload)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        except OSError:
+            # the record may be torn, and load_save stops at a torn record,
+            # so anything appended after it would be lost: start over
+            self._write_base(capture)
+            return
+        self.written = capture
+        self.since_base += 1
+        self.checkpoints += 1
+        if self.since_base >= self.compact_every:
+            self._write_base(capture)
+
+    def wait(self):
+        """Block until everything handed over so far is on disk."""
+        future = self.future
+        if future is not None:
+            future.result()
+
+    def discard(self):
+        """Forget the game (it's over): no save until the next start_level()."""
+        self.wait()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def close(self):
+        self.wait()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if self.pool is not None:
+            self.pool.shutdown()
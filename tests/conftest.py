@@ -0,0 +1,4 @@
+import os, sys
+
+# the package lives next to tests/, not installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
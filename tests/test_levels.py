@@ -0,0 +1,31 @@
+import struct
+import pytest
+from consolegame.levels import STREAM_MIN_SCREENS, LevelPack, build_level, write_level_pack
+
+def test_pack_leaves_out_levels_load_level_never_reads(tmp_path):
+    path = str(tmp_path / "levels.cglp")
+    wide = 80 * STREAM_MIN_SCREENS
+    levels = [(n, 24, 80, build_level(n, 24, 80)) for n in (1, 5, 10, 11)]
+    levels.append((12, 24, 80, build_level(12, 24, 80, wide)))
+    assert write_level_pack(path, levels) == [5, 10, 12]
+    pack = LevelPack(path)
+    try:
+        assert sorted(pack.index) == [(1, 24, 80, 0), (11, 24, 80, 0)]
+    finally:
+        pack.close()
+
+def test_opening_something_else_closes_it(tmp_path, monkeypatch):
+    import builtins
+    opened = []
+    real_open = builtins.open
+
+    def tracking_open(*args, **kwargs):
+        opened.append(real_open(*args, **kwargs))
+        return opened[-1]
+    monkeypatch.setattr(builtins, "open", tracking_open)
+    for name, data in (("empty", b""), ("short", b"CG"), ("other", b"x" * 64)):
+        path = tmp_path / name
+        path.write_bytes(data)
+        with pytest.raises((ValueError, struct.error)):
+            LevelPack(str(path))
+    assert len(opened) == 3 and all(f.closed for f in opened)
@@ -0,0 +1,26 @@
+import socket, struct, threading
+from consolegame.net import serve
+
+def test_a_client_resetting_the_connection_just_leaves():
+    logged, listening, stats = [], threading.Event(), {}
+
+    def log(message):
+        logged.append(message)
+        listening.set()
+    server = threading.Thread(target=lambda: stats.update(serve(2, 0, ticks=600, log=log)))
+    server.start()
+    listening.wait(10)
+    port = int(logged[0].rsplit(":", 1)[1])
+    stays = socket.create_connection(("127.0.0.1", port))
+    leaves = socket.create_connection(("127.0.0.1", port))
+    leaves.recv(4096)                   # welcome, then the level once both are in
+    leaves.recv(4096)
+    # close with a reset instead of a FIN; with nothing left to read, the
+    # server almost always finds out from recv rather than send
+    leaves.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    leaves.close()
+    stays.recv(4096)
+    stays.close()
+    server.join(10)
+    assert not server.is_alive()
+    assert 0 < stats["ticks"] < 600
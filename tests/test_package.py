@@ -0,0 +1,30 @@
+import ast, importlib, os, subprocess, sys
+import pytest
+import consolegame
+
+def defined_names(part):
+    """Public names assigned at the top of a part's source."""
+    path = os.path.join(os.path.dirname(consolegame.__file__), f"{part}.py")
+    names = set()
+    for node in ast.parse(open(path).read()).body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Assign):
+            names.update(t.id for t in node.targets if isinstance(t, ast.Name))
+    return {name for name in names if not name.startswith("_") and name != "numpy"}
+
+@pytest.mark.parametrize("part", consolegame.PARTS)
+def test_exports_list_every_public_name(part):
+    assert set(consolegame.EXPORTS[part]) == defined_names(part)
+
+def test_exports_resolve_to_their_part():
+    for name, part in consolegame.NAMES.items():
+        assert getattr(consolegame, name) is getattr(importlib.import_module(f"consolegame.{part}"), name)
+
+def test_unknown_name_imports_nothing():
+    code = ("import sys, consolegame\n"
+            "try:\n    consolegame.no_such_name\nexcept AttributeError:\n    pass\n"
+            "print(sorted(m for m in sys.modules if m.startswith('consolegame.')))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
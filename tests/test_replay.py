@@ -0,0 +1,32 @@
+import random
+import pytest
+from consolegame.levels import load_level
+from consolegame.engine import Recorder, Replay
+from consolegame.render import MemoryScreen
+from consolegame.game import play_level
+
+LEFT, RIGHT, JUMP, QUIT, NO_KEY = 1, 4, 23, 2, -1
+
+@pytest.mark.parametrize("level_num, width, seed", [(1, None, 0), (7, None, 1), (15, 240, 2), (12, None, 3)])
+def test_replay_ends_where_the_recording_did(tmp_path, level_num, width, seed):
+    rng = random.Random(seed)
+    keys = []
+    for _ in range(1500):
+        if rng.random() < 0.5:
+            keys.append(rng.choice([LEFT, RIGHT, RIGHT, JUMP, RIGHT]))
+        keys.append(NO_KEY)
+    keys.append(QUIT)
+    level_seed = rng.randrange(2 ** 32)
+    game_state = {"lives": 3, "speed_bonus": 0}
+    level = load_level(level_num, 24, 80, width, random.Random(level_seed))
+    recorder = Recorder(level_num, 24, 80, width, game_state, level_seed)
+    result = play_level(MemoryScreen(24, 80, keys), level, level_num, game_state, recorder=recorder)
+    path = str(tmp_path / "run.json")
+    recorder.save(path)
+
+    replay = Replay.load(path)
+    assert replay.run_headless()[:2] == (result, recorder.data["ticks"])
+    # and played back through the game loop itself, fast-forwarded
+    level, game_state = replay.build()
+    screen = MemoryScreen(24, 80, [NO_KEY] * 100000 + [ord(" ")])
+    assert play_level(screen, level, level_num, game_state, tick_rate=200, replay=replay) == result
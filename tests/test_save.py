@@ -0,0 +1,65 @@
+import math, random
+import pytest
+from consolegame.levels import load_level
+from consolegame.engine import ends_level, new_world, step
+from consolegame.save import SaveGame, capture_world, load_save, restore_world
+from consolegame.cli import parse_key_script, run_scripted
+
+def play(path, keys):
+    """The whole game on a 24x80 MemoryScreen saving to path, until keys run out."""
+    saver = SaveGame(path, background=False)
+    screen = run_scripted(parse_key_script(keys), 24, 80, 1, False, None, None, 0, 1, saver)
+    saver.close()
+    assert saver.error is None
+    return screen
+
+def test_completing_a_level_moves_the_save_on(tmp_path):
+    path = str(tmp_path / "game.sav")
+    play(path, "^R ^D*70")          # start level 1 and walk right to the goal
+    save = load_save(path)
+    assert save["level_num"] == 2
+    assert restore_world(save, {"lives": 3, "speed_bonus": 0})["tick"] == 0
+    # resuming goes straight into level 2, not back into level 1
+    play(path, "^D*10 ^S")
+    save = load_save(path)
+    assert save["level_num"] == 2
+    assert restore_world(save, {"lives": 3, "speed_bonus": 0})["tick"] > 0
+
+def test_reload_starts_the_save_over(tmp_path):
+    path = str(tmp_path / "game.sav")
+    play(path, "^R ^D*20 ^S ^Z ^P")  # walk, pause (a checkpoint), then Ctrl+P reloads
+    save = load_save(path)
+    assert save["level_num"] == 1
+    world = restore_world(save, {"lives": 3, "speed_bonus": 0})
+    assert world["tick"] == 0
+    assert world["players"][0].x == world["level"]["player"]["x"]
+
+def state(world):
+    """capture_world with the columns as lists, so two captures compare."""
+    capture = capture_world(world)
+    for store in ("enemies", "hearts"):
+        capture[store] = {name: list(column) if not isinstance(column, int) else column
+                          for name, column in capture[store].items()}
+    return capture
+
+@pytest.mark.parametrize("level_num, width", [(3, None), (7, None), (40, None), (15, 400), (30, math.inf)])
+@pytest.mark.parametrize("saved_at", [1, 37, 250])
+def test_restored_world_plays_on_the_same(tmp_path, level_num, width, saved_at):
+    rng = random.Random(level_num)
+    actions = [tuple(a for a in ("left", "right", "jump") if rng.random() < 0.3) for _ in range(saved_at + 300)]
+
+    def fresh():
+        level = load_level(level_num, 24, 80, width, random.Random(5))
+        return new_world(level, {"lives": 50, "speed_bonus": 0}, 24, 80, random.Random(9))
+    world = fresh()
+    saver = SaveGame(str(tmp_path / "game.sav"), compact_every=50, background=False)
+    saver.start_level(world, level_num)
+    for pressed in actions[:saved_at]:
+        assert not ends_level(step(world, pressed))
+        saver.checkpoint(world)
+    saver.close()
+    restored = restore_world(load_save(str(tmp_path / "game.sav")), {"lives": 0, "speed_bonus": 0})
+    assert state(restored) == state(world)
+    for pressed in actions[saved_at:]:
+        assert step(restored, pressed) == step(world, pressed)
+        assert state(restored) == state(world)
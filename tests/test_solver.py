@@ -0,0 +1,17 @@
+import random
+from consolegame.levels import build_level
+from consolegame.engine import SOLVER_GAVE_UP, solve_level
+
+def level_3():
+    return build_level(3, 24, 80, None, rng=random.Random(3))
+
+def test_solves_a_level():
+    assert isinstance(solve_level(level_3(), 24, 80), str)
+
+def test_unreachable_goal_is_unbeatable():
+    level = level_3()
+    level["goal"] = dict(level["goal"], y=-50)
+    assert solve_level(level, 24, 80) is None
+
+def test_running_out_of_states_is_not_unbeatable():
+    assert solve_level(level_3(), 24, 80, max_states=50) is SOLVER_GAVE_UP
@@ -0,0 +1,74 @@
+"""step() against traces recorded from it: fixed levels, fixed random
+input, the events every tick and a digest of the whole world every
+CHECK_EVERY ticks. `python -m tests.test_step` records them again after a
+change to the game that is meant to change how it plays."""
+import hashlib, json, math, os, random
+import pytest
+from consolegame.levels import load_level
+from consolegame.engine import ends_level, new_world, step
+from consolegame.save import capture_world
+
+TRACES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "step_traces.json")
+TICKS = 600
+CHECK_EVERY = 50
+# (level, width): handcrafted, generated, wider than the screen, endless and streamed
+CASES = [(1, None), (3, None), (7, None), (15, None), (40, None), (15, 400), (12, math.inf), (60, 640)]
+
+def case_name(level_num, width):
+    return f"level{level_num}/width{width}"
+
+def actions(seed):
+    rng = random.Random(seed)
+    # mostly right, so the player gets along the level and meets things
+    return [tuple(a for a, odds in (("left", 0.15), ("right", 0.6), ("jump", 0.3)) if rng.random() < odds)
+            for _ in range(TICKS)]
+
+def plain(value):
+    """A capture with every column and tuple as a list of plain Python values."""
+    if isinstance(value, float):        # numpy.float64 is one too
+        return float(value)
+    if isinstance(value, dict):
+        return {str(k): plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)) or hasattr(value, "tolist"):
+        return [plain(v) for v in value]
+    return value
+
+def digest(world):
+    text = json.dumps(plain(capture_world(world)), sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+def trace(level_num, width):
+    level = load_level(level_num, 24, 80, width, random.Random(5))
+    world = new_world(level, {"lives": 50, "speed_bonus": 0}, 24, 80, random.Random(9))
+    events, digests = [], {}
+    for tick, pressed in enumerate(actions(level_num)):
+        happened = step(world, pressed)
+        if happened:
+            events.append([tick, [name for name, _ in happened]])
+        if tick % CHECK_EVERY == 0:
+            digests[str(tick)] = digest(world)
+        if ends_level(happened):
+            break
+    return {"ticks": tick + 1, "events": events, "digests": digests, "end": digest(world)}
+
+@pytest.fixture(scope="module")
+def traces():
+    with open(TRACES) as f:
+        return json.load(f)
+
+@pytest.mark.parametrize("level_num, width", CASES)
+def test_step_matches_recorded_trace(traces, level_num, width):
+    expected = traces[case_name(level_num, width)]
+    got = trace(level_num, width)
+    for tick, want in expected["digests"].items():
+        assert got["digests"].get(tick) == want, f"world differs by tick {tick}"
+    assert got["events"] == expected["events"]
+    assert got["ticks"] == expected["ticks"]
+    assert got["end"] == expected["end"]
+
+if __name__ == "__main__":
+    recorded = {case_name(*case): trace(*case) for case in CASES}
+    with open(TRACES, "w") as f:
+        json.dump(recorded, f, indent=1)
+        f.write("\n")
+    print(f"recorded {len(recorded)} traces in {TRACES}")